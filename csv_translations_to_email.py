@@ -7,11 +7,18 @@ Usage:
 """
 import argparse
 import csv
+import functools
+import hashlib
+import json
+import os
 import re
 import sys
 import tempfile
+from collections.abc import Iterator, Mapping
+from itertools import chain
 from io import StringIO
 from pathlib import Path
+from types import MappingProxyType
 
 # Locale columns in sheet order (Key is column 0). Must match Liquid locale_key.
 LOCALE_COLUMNS = [
@@ -20,6 +27,8 @@ LOCALE_COLUMNS = [
     "ms", "no", "pl", "pt", "pt-br", "ro", "ru", "es", "es-419", "sv", "th",
     "tr", "uk", "vi",
 ]
+LOCALE_COLUMNS = [sys.intern(loc) for loc in LOCALE_COLUMNS]
+_LOCALE_COLUMN_INDEX = {loc: i for i, loc in enumerate(LOCALE_COLUMNS)}
 
 # Locale presets for "which languages to include"
 LOCALE_PRESET_EN_ONLY = ["en"]
@@ -69,6 +78,7 @@ STRUCTURE_KEYS = [
     "usp_ui_1_image_url", "usp_ui_2_image_url", "usp_ui_3_image_url",
     "hotel_reco_headline", "hotel_reco_type", "hotel_reco_cta_text", "hotel_reco_cta_url",
 ]
+STRUCTURE_KEYS_SET = frozenset(STRUCTURE_KEYS)
 
 # Map (module, key) -> internal key for new CSV format with Module + module_index columns
 MODULE_KEY_MAP = {
@@ -151,6 +161,13 @@ MODULE_KEY_MAP = {
     ("hotel_reco_grid_4", "hotel_reco_cta_url"): "hotel_reco_cta_url",
 }
 
+# MODULE_KEY_MAP as module -> {key without underscores -> internal key}, for load_translations lookups
+# (body1, body_1 and bo_dy1 all match body_1; an unknown module is a single miss)
+_MODULE_KEY_MAP_NESTED: dict[str, dict[str, str]] = {
+    mod: {key.replace("_", ""): internal for (m, key), internal in MODULE_KEY_MAP.items() if m == mod}
+    for mod in dict.fromkeys(m for m, _ in MODULE_KEY_MAP)
+}
+
 PLACEHOLDER_DESIGN_TOKENS = "{{ DESIGN_TOKENS }}"
 PLACEHOLDER_APP_DOWNLOAD_SETTINGS = "{{ APP_DOWNLOAD_SETTINGS }}"
 PLACEHOLDER_CONTENT_CAPTURES = "{{ CONTENT_CAPTURES }}"
@@ -164,8 +181,33 @@ PLACEHOLDER_TEXT_LEFT_IMAGE_RIGHT_MODULE = "{{ TEXT_LEFT_IMAGE_RIGHT_MODULE }}"
 PLACEHOLDER_ALTERNATING_TEXT_IMAGE_MODULE = "{{ ALTERNATING_TEXT_IMAGE_MODULE }}"
 PLACEHOLDER_HOTEL_RECO_GRID_4 = "{{ HOTEL_RECO_GRID_4 }}"
 PLACEHOLDER_CONFIG = "{{ CONFIG_BLOCK }}"
+PLACEHOLDER_HOTEL_RECO_ASSIGNS = "{{ HOTEL_RECO_ASSIGNS }}"
 PLACEHOLDER_LINKS = "{{ LINKS_BLOCK }}"
 PLACEHOLDER_TERMS_DEFAULTS = "{{ TERMS_DEFAULTS_BLOCK }}"
+PLACEHOLDER_FOOTER_APP_LINE = "{{ FOOTER_APP_LINE }}"
+PLACEHOLDER_FOOTER_PREFS = "{{ FOOTER_PREFS }}"
+
+# All BASE_TEMPLATE placeholders; see _compile_template
+_TEMPLATE_PLACEHOLDERS = (
+    PLACEHOLDER_LINKS,
+    PLACEHOLDER_DESIGN_TOKENS,
+    PLACEHOLDER_CONFIG,
+    PLACEHOLDER_HOTEL_RECO_ASSIGNS,
+    PLACEHOLDER_APP_DOWNLOAD_SETTINGS,
+    PLACEHOLDER_CONTENT_CAPTURES,
+    PLACEHOLDER_FOOTER_APP_LINE,
+    PLACEHOLDER_FOOTER_PREFS,
+    PLACEHOLDER_TERMS_DEFAULTS,
+    PLACEHOLDER_ROWS_ABOVE_IMAGE,
+    PLACEHOLDER_IMAGE_ROW,
+    PLACEHOLDER_ROWS_BELOW_IMAGE,
+    PLACEHOLDER_HERO_TWO_COLUMN_MODULE,
+    PLACEHOLDER_ICON_LEFT_TEXT_RIGHT_MODULE,
+    PLACEHOLDER_TEXT_LEFT_IMAGE_RIGHT_MODULE,
+    PLACEHOLDER_ALTERNATING_TEXT_IMAGE_MODULE,
+    PLACEHOLDER_HOTEL_RECO_GRID_4,
+    PLACEHOLDER_APP_DOWNLOAD_MODULE,
+)
 
 # Rows for each module in standard input template (csv_key, en_placeholder).
 # Structure keys get link hints; translatable get empty or example.
@@ -293,20 +335,32 @@ def _load_hotel_reco_module() -> str:
     return ""
 
 
+@functools.lru_cache(maxsize=4096)
 def _escape_liquid_raw(s: str) -> str:
     """Escape text so it can be embedded in Liquid capture without breaking tags."""
     if not s:
         return ""
+    if "%" not in s:
+        return s
     s = s.replace("{%", "{{ '{%' }}")
     s = s.replace("%}", "{{ '%}' }}")
     return s
 
 
+_HTML_ESCAPE_RE = re.compile(r'[&<>"]')
+_HTML_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+
+
+@functools.lru_cache(maxsize=2048)
 def _html_escape(s: str) -> str:
-    s = (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
-    return s
+    if not s:
+        return ""
+    if not _HTML_ESCAPE_RE.search(s):
+        return s
+    return _HTML_ESCAPE_RE.sub(lambda m: _HTML_ESCAPES[m.group(0)], s)
 
 
+@functools.lru_cache(maxsize=256)
 def _normalise_url(url: str) -> str:
     url = (url or "").strip()
     if not url:
@@ -316,36 +370,106 @@ def _normalise_url(url: str) -> str:
     return url
 
 
+def _placeholder_offsets(template: str, placeholders: tuple[str, ...]) -> list[tuple[int, int, str]]:
+    """Sorted (start, end, placeholder) for every occurrence; one str.find sweep per placeholder."""
+    offsets = []
+    for p in placeholders:
+        i = template.find(p)
+        while i != -1:
+            offsets.append((i, i + len(p), p))
+            i = template.find(p, i + len(p))
+    offsets.sort()
+    return offsets
+
+
+def _compile_template(template: str, placeholders: tuple[str, ...]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split template into literal segments and the placeholders between them
+    (len(segments) == len(slots) + 1), so rendering is a single join with no searching."""
+    segments: list[str] = []
+    slots: list[str] = []
+    prev = 0
+    for start, end, p in _placeholder_offsets(template, placeholders):
+        segments.append(template[prev:start])
+        slots.append(p)
+        prev = end
+    segments.append(template[prev:])
+    return tuple(segments), tuple(slots)
+
+
+def _fill_template(
+    segments: tuple[str, ...], slots: tuple[str, ...], values: dict[str, str]
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Substitute the slots present in values; returns the remaining (segments, slots).
+    When every slot is filled the result is a single segment."""
+    out_segments: list[str] = []
+    out_slots: list[str] = []
+    parts = [segments[0]]
+    for slot, seg in zip(slots, segments[1:]):
+        if slot in values:
+            parts.append(values[slot])
+            parts.append(seg)
+        else:
+            out_segments.append("".join(parts))
+            out_slots.append(slot)
+            parts = [seg]
+    out_segments.append("".join(parts))
+    return tuple(out_segments), tuple(out_slots)
+
+
+def _template_parts(segments: tuple[str, ...], slots: tuple[str, ...], values: dict[str, str]) -> list[str]:
+    """Segments interleaved with every slot's value; join (or write out) for the rendered template."""
+    parts = [""] * (len(segments) + len(slots))
+    parts[::2] = segments
+    parts[1::2] = [values[slot] for slot in slots]
+    return parts
+
+
+def _join_rows(segments: tuple[str, ...], rows: tuple[list[str], ...]) -> str:
+    """Render a shell whose slots are rows of pre-split parts with a single join."""
+    return "".join(chain(segments[:1], *(chain(row, (seg,)) for row, seg in zip(rows, segments[1:]))))
+
+
 def get_csv_locales(csv_path: Path) -> list[str]:
     """Infer locale columns from CSV headers. Returns locale codes found, in LOCALE_COLUMNS order."""
-    with open(csv_path, newline="", encoding="utf-8-sig") as f:
-        if csv_path.suffix.lower() == ".tsv":
-            reader = csv.DictReader(f, delimiter="\t")
-        else:
-            sample = f.read(4096)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
-            except csv.Error:
-                dialect = csv.excel
-            reader = csv.DictReader(f, dialect=dialect)
-        fields = reader.fieldnames or []
+    csv_path = Path(csv_path)
+    st = csv_path.stat()
+    return list(_get_csv_locales_cached(str(csv_path), (st.st_mtime_ns, st.st_size)))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_csv_locales_cached(csv_path_str: str, _csv_stamp: tuple[int, int]) -> tuple[str, ...]:
+    """get_csv_locales body, cached per path so repeated calls skip re-sniffing the file. Reads the header
+    exactly as load_translations does, and _csv_stamp (mtime_ns, size) matches its cache key, so both
+    agree on the locales and on whether the file changed."""
+    _, fields, _, _ = _open_csv_reader(Path(csv_path_str))
+    return tuple(_infer_locales(fields))
+
+
+_NORM_LOCALE_CHARS = str.maketrans({"-": "_", " ": None})
+
+
+@functools.lru_cache(maxsize=256)
+def _norm_locale(s: str) -> str:
+    """Header/locale comparison form: trimmed, lowercase, no spaces, "_" for "-"."""
+    return s.strip().lower().translate(_NORM_LOCALE_CHARS)
+
+
+def _csv_layout(fields: list[str]) -> tuple[bool, int]:
+    """(use_module_format, locale_start) for a header row: Key, Module, module_index, <locales> or Key, <locales>."""
     use_module_format = (
         len(fields) >= 3
         and (fields[1] or "").strip().lower() == "module"
         and (fields[2] or "").strip().lower().replace(" ", "") == "module_index"
     )
-    locale_start = 3 if use_module_format else 1
+    return use_module_format, 3 if use_module_format else 1
+
+
+def _infer_locales(fields: list[str]) -> list[str]:
+    """Locale codes present in a header row, in LOCALE_COLUMNS order; ["en"] when none match."""
+    _, locale_start = _csv_layout(fields)
     locale_headers = [h for h in fields[locale_start:] if (h or "").strip()]
-    header_norms = {h.strip(): h for h in locale_headers}
-    found: list[str] = []
-    for loc in LOCALE_COLUMNS:
-        norm = loc.replace("-", "_").lower()
-        for key in header_norms:
-            knorm = key.lower().replace("-", "_").replace(" ", "")
-            if loc == key or norm == knorm:
-                found.append(loc)
-                break
+    header_norms = {_norm_locale(h) for h in locale_headers}
+    found = [loc for loc in LOCALE_COLUMNS if _norm_locale(loc) in header_norms]
     if not found and locale_headers:
         for i, h in enumerate(locale_headers):
             hc = (h or "").strip()
@@ -354,6 +478,12 @@ def get_csv_locales(csv_path: Path) -> list[str]:
     return found if found else ["en"]
 
 
+# href=" or other attr=": double the opening quote so CSV treats it as escaped (skip if already ="")
+_ATTR_OPEN_QUOTE_RE = re.compile(r'="(?!")')
+# "> closing an attr: double the quote so CSV treats it as escaped
+_ATTR_CLOSE_QUOTE_RE = re.compile(r'(?<!")"(?=>)')
+
+
 def _fix_unescaped_quotes_in_csv(raw: str) -> str:
     """
     Fix unescaped double-quotes inside CSV/TSV quoted fields.
@@ -361,105 +491,198 @@ def _fix_unescaped_quotes_in_csv(raw: str) -> str:
     parser to truncate the field at href=". We double them so CSV parsing succeeds.
     Only touches " that look like HTML attribute delimiters (= " and " >), not already doubled.
     """
-    # href=" or other attr=": double the opening quote so CSV treats it as escaped (skip if already ="")
-    raw = re.sub(r'="(?!")', r'=""', raw)
-    # "> closing an attr: double the quote so CSV treats it as escaped
-    raw = re.sub(r'(?<!")"(?=>)', r'""', raw)
+    if '"' not in raw:
+        return raw
+    raw = _ATTR_OPEN_QUOTE_RE.sub('=""', raw)
+    raw = _ATTR_CLOSE_QUOTE_RE.sub('""', raw)
     return raw
 
 
+def _open_csv_reader(csv_path: Path | StringIO) -> tuple[Iterator[list[str]], list[str], bool, int]:
+    """Read and quote-fix the CSV/TSV (or in-memory CSV text), sniff the dialect and consume the header row.
+    Returns (row reader, fieldnames, use_module_format, locale_start); fieldnames is empty for an empty file."""
+    if isinstance(csv_path, StringIO):
+        raw_content = csv_path.getvalue()
+        is_tsv = False
+    else:
+        # One bulk read + decode; newlines normalised as text-mode reading would
+        raw_content = csv_path.read_bytes().decode("utf-8-sig")
+        is_tsv = csv_path.suffix.lower() == ".tsv"
+    if "\r" in raw_content:
+        raw_content = raw_content.replace("\r\n", "\n").replace("\r", "\n")
+    raw_content = _fix_unescaped_quotes_in_csv(raw_content)
+    if is_tsv:
+        dialect = csv.excel_tab
+    else:
+        sample = raw_content[:4096]
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
+            # Sniffer can set doublequote=False; our _fix_unescaped_quotes_in_csv relies on "" as escape
+            dialect.doublequote = True
+        except csv.Error:
+            dialect = csv.excel
+    unquoted = dialect.quoting == csv.QUOTE_NONE or dialect.quotechar not in raw_content
+    if unquoted and not dialect.skipinitialspace and not dialect.escapechar:
+        # Nothing quoted (typical translation export): split lines directly instead of the csv state machine
+        delimiter = dialect.delimiter
+        reader = (line.split(delimiter) if line else [] for line in raw_content.split("\n"))
+    else:
+        reader = csv.reader(StringIO(raw_content), dialect=dialect)
+    fields = next(reader, None) or []
+    use_module_format, locale_start = _csv_layout(fields)
+    return reader, fields, use_module_format, locale_start
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_row_key(raw: str) -> str:
+    """Key/Module cell -> lookup form (trimmed, lowercase, no spaces). Cell values repeat across rows and files;
+    the result is interned since it ends up as a translations/structure key."""
+    return sys.intern(raw.strip().lower().replace(" ", ""))
+
+
 def load_translations(
-    csv_path: Path,
+    csv_path: Path | StringIO,
     include_locales: list[str] | None = None,
 ) -> tuple[dict[str, dict[str, str]], dict[str, str]]:
     """
-    Read CSV or TSV. Supports two formats:
+    Read CSV or TSV (a path, or CSV text in a StringIO). Supports two formats:
     A) Legacy: Key, en, ar, ... (locale columns at index 1+)
     B) New: Key, Module, module_index, en, ar, ... (locale columns at index 3+)
     include_locales: if None, infers from CSV headers via get_csv_locales.
     Return (translations[key][locale] = value, structure[key] = single_value).
     """
-    locales = include_locales or get_csv_locales(csv_path)
+    if isinstance(csv_path, StringIO):
+        return _parse_translations(csv_path, include_locales)
+    try:
+        st = csv_path.stat()
+    except OSError:
+        return _parse_translations(csv_path, include_locales)
+    translations, structure = _load_translations_cached(
+        str(csv_path), (st.st_mtime_ns, st.st_size), tuple(include_locales) if include_locales else None
+    )
+    # The cached parse is shared; callers get their own dicts
+    return {key: dict(vals) for key, vals in translations.items()}, dict(structure)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_translations_cached(
+    csv_path: str,
+    _csv_stamp: tuple[int, int],
+    include_locales: tuple[str, ...] | None,
+) -> tuple[dict[str, dict[str, str]], dict[str, str]]:
+    """Parse cached per (path, (mtime_ns, size), locales). Results are shared, do not mutate."""
+    return _parse_translations(Path(csv_path), list(include_locales) if include_locales else None)
+
+
+def _parse_translations(
+    csv_path: Path | StringIO,
+    include_locales: list[str] | None,
+) -> tuple[dict[str, dict[str, str]], dict[str, str]]:
+    """load_translations body, without caching."""
     translations: dict[str, dict[str, str]] = {}
     structure: dict[str, str] = {}
-    raw_content = csv_path.read_text(encoding="utf-8-sig")
-    raw_content = _fix_unescaped_quotes_in_csv(raw_content)
-    f = StringIO(raw_content)
-    if csv_path.suffix.lower() == ".tsv":
-        reader = csv.DictReader(f, delimiter="\t")
-    else:
-        sample = raw_content[:4096]
-        f.seek(0)
-        try:
-            dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
-            # Sniffer can set doublequote=False; our _fix_unescaped_quotes_in_csv relies on "" as escape
-            dialect.doublequote = True
-        except csv.Error:
-            dialect = csv.excel
-        reader = csv.DictReader(f, dialect=dialect)
-    if not reader.fieldnames:
+    reader, fields, use_module_format, locale_start = _open_csv_reader(csv_path)
+    locales = include_locales or _infer_locales(fields)
+    if not fields:
         return translations, structure
-    fields = reader.fieldnames
-    use_module_format = (
-        len(fields) >= 3
-        and (fields[1] or "").strip().lower() == "module"
-        and (fields[2] or "").strip().lower().replace(" ", "") == "module_index"
-    )
-    locale_start = 3 if use_module_format else 1
     locale_headers = fields[locale_start:]
+    header_by_norm: dict[str, str] = {}
+    for h in locale_headers:
+        if h:
+            header_by_norm.setdefault(_norm_locale(h), h)
     locale_to_header: dict[str, str] = {}
     for loc in locales:
-        for h in locale_headers:
-            if not h:
-                continue
-            hnorm = h.strip().lower().replace(" ", "").replace("_", "-")
-            if loc == hnorm or loc.replace("-", "_") == hnorm.replace("-", "_"):
-                locale_to_header[loc] = h
-                break
-        if loc not in locale_to_header and loc in LOCALE_COLUMNS:
-            idx = LOCALE_COLUMNS.index(loc)
+        h = header_by_norm.get(loc.replace("-", "_"))
+        if h is not None:
+            locale_to_header[loc] = h
+        elif loc in _LOCALE_COLUMN_INDEX:
+            idx = _LOCALE_COLUMN_INDEX[loc]
             if idx < len(locale_headers) and (locale_headers[idx] or "").strip():
                 locale_to_header[loc] = locale_headers[idx].strip()
-    key_col = fields[0]
-    module_col = fields[1] if use_module_format and len(fields) >= 2 else None
+    # Column index per header name (last one wins on duplicate headers, as with DictReader)
+    col_index = {h: i for i, h in enumerate(fields)}
+    key_idx = col_index[fields[0]]
+    module_idx = col_index[fields[1]] if use_module_format else None
+    # Interned locale codes so every translations[key] dict shares the same key objects
+    locale_to_idx = [
+        (sys.intern(loc), col_index.get(locale_to_header[loc], -1) if loc in locale_to_header else -1)
+        for loc in locales
+    ]
+    en_idx = dict(locale_to_idx).get("en", -1)
 
     for row in reader:
-        key_raw = (row.get(key_col) or "").strip().lower().replace(" ", "")
+        if not row:
+            continue
+        n = len(row)
+        key_raw = _normalize_row_key(row[key_idx]) if key_idx < n else ""
         if not key_raw:
             continue
-        module_raw = (row.get(module_col, "") or "").strip().lower().replace(" ", "") if module_col else ""
-        values_by_locale: dict[str, str] = {}
-        for loc in locales:
-            header = locale_to_header.get(loc)
-            val = ((row.get(header, "") or "") if header else "").strip()
-            values_by_locale[loc] = val
+        module_raw = _normalize_row_key(row[module_idx]) if module_idx is not None and module_idx < n else ""
 
         if use_module_format and module_raw:
-            internal_key = MODULE_KEY_MAP.get((module_raw, key_raw))
-            if internal_key is None:
-                internal_key = MODULE_KEY_MAP.get((module_raw, key_raw.replace("_", "")))
+            submap = _MODULE_KEY_MAP_NESTED.get(module_raw)
+            internal_key = submap.get(key_raw.replace("_", "")) if submap is not None else None
             if internal_key is None:
                 continue
         else:
             internal_key = key_raw
 
-        if internal_key in STRUCTURE_KEYS:
-            for loc in locales:
-                v = (values_by_locale.get(loc, "") or "").strip()
+        if internal_key in STRUCTURE_KEYS_SET:
+            # First non-empty value in locale order; "" if the row has none
+            for _, idx in locale_to_idx:
+                v = row[idx].strip() if 0 <= idx < n else ""
                 if v:
                     structure[internal_key] = v
                     break
-            if internal_key not in structure:
-                structure[internal_key] = (values_by_locale.get("en", "") or "").strip()
+            else:
+                structure.setdefault(internal_key, "")
         else:
-            en_val = (values_by_locale.get("en", "") or "").strip()
-            for loc in locales:
-                if not (values_by_locale.get(loc, "") or "").strip():
-                    values_by_locale[loc] = en_val
-            translations[internal_key] = values_by_locale
+            en_val = row[en_idx].strip() if 0 <= en_idx < n else ""
+            translations[internal_key] = {
+                loc: (row[idx].strip() if 0 <= idx < n else "") or en_val for loc, idx in locale_to_idx
+            }
     return translations, structure
 
 
+# Up to this many locales, content captures use an if/elsif ladder instead of case/when
+_IF_LADDER_MAX_LOCALES = 6
+
+# Locale branches are emitted busiest first, since Liquid tests when/elsif arms in order;
+# locales not listed keep their relative order after these
+_LOCALE_BRANCH_ORDER = ("en", "en-gb", "es", "fr", "de", "pt-br", "ja", "it", "nl", "es-419", "pt", "fr-ca")
+_LOCALE_BRANCH_RANK = {loc: i for i, loc in enumerate(_LOCALE_BRANCH_ORDER)}
+
+
+def _by_branch_rank(locales: list[str], loc_vals: list[str]) -> list[tuple[str, str]]:
+    """(locale, value) pairs in _LOCALE_BRANCH_ORDER, the rest in their given order."""
+    unranked = len(_LOCALE_BRANCH_ORDER)
+    return sorted(zip(locales, loc_vals), key=lambda lv: _LOCALE_BRANCH_RANK.get(lv[0], unranked))
+
+
+def _locale_capture(key: str, en_val: str, locales: list[str], loc_vals: list[str]) -> str:
+    """{% capture key %} choosing between loc_vals (raw text, aligned with locales) on locale_key."""
+    en_esc = _escape_liquid_raw(en_val)
+    if all(v == en_val for v in loc_vals):
+        # Every branch renders the English value (e.g. en_only): skip the case/when scaffolding
+        return f"{{%- capture {key} -%}}{en_esc}{{%- endcapture -%}}"
+    if len(locales) <= _IF_LADDER_MAX_LOCALES:
+        # Few locales (top_5 etc.): a short if/elsif ladder, leaving out branches that match the fallback
+        branches = [(loc, v) for loc, v in _by_branch_rank(locales, loc_vals) if v != en_val]
+        ladder = "".join(
+            f'  {{%- {"if" if i == 0 else "elsif"} locale_key == "{loc}" -%}}{_escape_liquid_raw(v)}\n'
+            for i, (loc, v) in enumerate(branches)
+        )
+        return f"{{%- capture {key} -%}}\n{ladder}  {{%- else -%}}{en_esc}\n  {{%- endif -%}}\n{{%- endcapture -%}}"
+    whens = "".join(
+        f'    {{%- when "{loc}" -%}}{en_esc if v == en_val else _escape_liquid_raw(v)}\n'
+        for loc, v in _by_branch_rank(locales, loc_vals)
+    )
+    return (
+        f"{{%- capture {key} -%}}\n  {{%- case locale_key -%}}\n{whens}"
+        f"    {{%- else -%}}{en_esc}\n  {{%- endcase -%}}\n{{%- endcapture -%}}"
+    )
+
+
 def build_content_captures(
     translations: dict[str, dict[str, str]],
     include_locales: list[str] | None = None,
@@ -467,39 +690,167 @@ def build_content_captures(
     """Generate Liquid {% capture key %} {% case locale_key %} ... {% endcapture %} for each key.
     include_locales: only output when clauses for these locales (default: all LOCALE_COLUMNS)."""
     locales = include_locales or LOCALE_COLUMNS
-    lines = []
+    blocks = []
     for key in TRANSLATABLE_KEYS:
         if key not in translations:
             continue
         vals = translations[key]
-        lines.append("{%- capture " + key + " -%}")
-        lines.append("  {%- case locale_key -%}")
-        for loc in locales:
-            v = vals.get(loc, "").strip() or vals.get("en", "").strip()
-            v_esc = _escape_liquid_raw(v)
-            lines.append('    {%- when "' + loc + '" -%}' + v_esc)
-        lines.append('    {%- else -%}' + _escape_liquid_raw(vals.get("en", "").strip()))
-        lines.append("  {%- endcase -%}")
-        lines.append("{%- endcapture -%}")
-    return "\n".join(lines)
+        en_val = vals.get("en", "").strip()
+        blocks.append(_locale_capture(key, en_val, locales, [vals.get(loc, "").strip() or en_val for loc in locales]))
+    return "\n".join(blocks)
+
+
+# Footer app download line per locale_key (". " becomes a line break when rendered)
+FOOTER_APP_LINES: dict[str, str] = {
+    "ar": "احجز كأهل البلد. حمّل التطبيق.",
+    "zh-cn": "订房有一套。 下载应用。",
+    "zh-tw": "懂玩的人，都這樣訂房 下載應用程式",
+    "zh-hk": "訂得安心。 下載應用程式。",
+    "hr": "Rezervirajte pametnije. Preuzmite aplikaciju.",
+    "cs": "Rezervujte levou zadní. Stáhněte si aplikaci.",
+    "da": "Book med overblik. Download appen.",
+    "nl": "Boeken zonder poespas. Download de app.",
+    "en-gb": "Book like an insider. Download the app.",
+    "en": "Book like an insider. Download the app.",
+    "fil": "Mag-book nang may kumpyansa. I-download ang app.",
+    "fi": "Varaa fiksusti. Lataa sovellus.",
+    "fr": "Réserver sans se tromper. Télécharger l'application.",
+    "fr-ca": "Réservez en toute confiance. Télécharger l'application.",
+    "de": "Buchen mit klarem Blick. App herunterladen.",
+    "el": "Κάνε τώρα τις πιο έξυπνες κρατήσεις. Κατεβάστε την εφαρμογή.",
+    "he": "להזמין חכם זה פשוט. הורידו את האפליקציה.",
+    "hu": "Foglaljon magabiztosan. Töltse le az alkalmazást.",
+    "id": "Pesan tanpa cemas. Unduh aplikasi.",
+    "it": "Prenotare senza pensieri. Scarica l'app.",
+    "ja": "納得して予約する。アプリをダウンロード。",
+    "ko": "예약에 확신을 더하다. 앱을 다운로드하세요.",
+    "ms": "Kejelasan diutamakan. Tempah tanpa ragu. Muat turun aplikasi.",
+    "no": "Book som en insider. Last ned appen.",
+    "pl": "Rezerwuj jak zawodowiec. Pobierz aplikację.",
+    "pt": "Reserve com confiança. Descarregue a app.",
+    "pt-br": "Reserve sem erro. Baixe o app.",
+    "ro": "Rezervă cu toată încrederea. Descarcă aplicația.",
+    "ru": "Бронируйте с умом. Скачайте приложение.",
+    "es": "Reservar sin equivocarse. Descarga la app.",
+    "es-419": "Reservar sin equivocarse. Descarga la aplicación.",
+    "sv": "Boka som en insider. Ladda ner appen.",
+    "th": "จองคุ้มว่า ราคาแบบคนวงใน ดาวน์โหลดแอป",
+    "tr": "Daha akıllıca rezervasyon yap. Uygulamayı indirin.",
+    "uk": "Бронюй як місцевий. Завантажте застосунок.",
+    "vi": "Đặt chỗ thông minh hơn. Tải ứng dụng.",
+}
+
+# Footer email-preferences sentence per locale_key; <emailPreferences>/<unsubscribe> become links
+FOOTER_PREFS_TEXTS: dict[str, str] = {
+    "ar": "قم بتحديث <emailPreferences>تفضيلات بريدك الإلكتروني</emailPreferences> لاختيار رسائل البريد الإلكتروني التي تتلقاها أو <unsubscribe>إلغاء الاشتراك</unsubscribe> من كل رسائل البريد الإلكتروني.",
+    "zh-cn": "更新 <emailPreferences>电子邮件偏好设置</emailPreferences>，选择接收哪些邮件或 <unsubscribe>退订</unsubscribe>所有邮件。",
+    "zh-tw": "更新 <emailPreferences>電子郵件偏好</emailPreferences>，選擇要收到哪些電子郵件，或是 <unsubscribe>取消訂閱</unsubscribe>所有電子郵件。",
+    "zh-hk": "更新 <emailPreferences>電郵偏好設定</emailPreferences>以選擇接收哪些電郵或 <unsubscribe>取消訂閱</unsubscribe>所有電郵。",
+    "hr": "Ažurirajte svoje <emailPreferences>postavke za e-mail</emailPreferences> kako biste odabrali koje e-poruke želite primati ili se u potpunosti <unsubscribe>odjavite</unsubscribe>.",
+    "cs": "Upravte si <emailPreferences>předvolby e-mailů</emailPreferences> a vyberte sdělení, která chcete dostávat. Můžete si také <unsubscribe>odhlásit odběr</unsubscribe> veškerých e-mailů.",
+    "da": "Opdater <emailPreferences>indstillinger for e-mail</emailPreferences> for at vælge, hvilke e-mails du får, eller <unsubscribe>afmeld</unsubscribe> alle e-mails.",
+    "nl": "Werk je <emailPreferences>e-mailvoorkeuren</emailPreferences> bij om te kiezen welke e-mails je wilt ontvangen of om je <unsubscribe>af te melden</unsubscribe> voor alle e-mails.",
+    "en-gb": "Update your <emailPreferences>email preferences</emailPreferences> to choose which emails you get or <unsubscribe>unsubscribe</unsubscribe> from all emails.",
+    "en": "Update your <emailPreferences>email preferences</emailPreferences> to choose which emails you get or <unsubscribe>unsubscribe</unsubscribe> from all emails.",
+    "fil": "I-update ang <emailPreferences>mga preference mo sa email</emailPreferences> para piliin kung anong mga email ang matatanggap mo o <unsubscribe>mag-unsubscribe</unsubscribe> sa lahat ng email.",
+    "fi": "Päivitä <emailPreferences>sähköpostiasetukset</emailPreferences> ja valitse saamasi sähköpostiviestit tai <unsubscribe>peruuta</unsubscribe> kaikkien sähköpostiviestien tilaus.",
+    "fr": "Mettez à jour vos <emailPreferences>préférences en matière d'e-mails</emailPreferences> pour choisir ce que vous souhaitez recevoir ou pour vous <unsubscribe>désabonner</unsubscribe> de tous les e-mails.",
+    "fr-ca": "Mettez à jour vos <emailPreferences>préférences de courriel</emailPreferences> pour choisir les courriels que vous recevez ou vous <unsubscribe>désabonner</unsubscribe> de tous les courriels.",
+    "de": "Aktualisieren Sie Ihre <emailPreferences>E-Mail-Einstellungen</emailPreferences>, um auszuwählen, welche E-Mails Sie erhalten möchten, oder um sich von allen E-Mails <unsubscribe>abzumelden</unsubscribe>.",
+    "el": "Ενημερώστε τις <emailPreferences>προτιμήσεις email</emailPreferences> σας για να επιλέξετε ποια email θα λαμβάνετε ή να <unsubscribe>καταργήσετε την εγγραφή σας</unsubscribe> από όλα τα email.",
+    "he": "יש לעדכן את <emailPreferences>העדפות האימייל</emailPreferences> שלכם כדי לבחור אילו אימיילים לקבל, או <unsubscribe>לבטל את המינוי</unsubscribe> על כל האימיילים.",
+    "hu": "Frissítse <emailPreferences>e-mail-beállításait</emailPreferences>, hogy kiválaszthassa, mely e-maileket szeretné megkapni, vagy <unsubscribe>leiratkozhat</unsubscribe> az összes e-mailről.",
+    "id": "Perbarui <emailPreferences>preferensi email</emailPreferences> Anda untuk memilih email mana yang Anda dapatkan atau <unsubscribe>berhenti berlangganan</unsubscribe> dari semua email.",
+    "it": "Aggiorna le <emailPreferences>preferenze delle email</emailPreferences> per scegliere quali email ricevere o per <unsubscribe>cancellare l'iscrizione</unsubscribe> a tutte le email.",
+    "ja": "<emailPreferences>メール設定</emailPreferences>を更新して、受信するメールを選択したり、すべてのメールの<unsubscribe>登録を解除</unsubscribe>したりできます。",
+    "ko": "<emailPreferences>이메일 환경 설정</emailPreferences>을 업데이트하여 받을 이메일을 선택하거나 모든 이메일을 <unsubscribe>구독 해제</unsubscribe>할 수 있어요.",
+    "ms": "Kemas kini <emailPreferences>keutamaan e-mel</emailPreferences> anda untuk memilih e-mel yang anda terima atau <unsubscribe>nyahlanggan</unsubscribe> semua e-mel.",
+    "no": "Oppdater <emailPreferences>e-postpreferansene</emailPreferences> dine for å velge hvilke e-poster du får, eller <unsubscribe>avslutt abonnementet</unsubscribe> på alle e-poster.",
+    "pl": "Aktualizacja <emailPreferences>preferencji dotyczących e-maili</emailPreferences> pozwala wybrać, które wiadomości chcesz otrzymywać, lub <unsubscribe>zrezygnować</unsubscribe> ze wszystkich wiadomości.",
+    "pt": "Atualize as suas <emailPreferences>preferências de e-mail</emailPreferences> para escolher os e-mails que recebe ou <unsubscribe>cancele a subscrição</unsubscribe> de todos os e-mails.",
+    "pt-br": "Atualize suas <emailPreferences>preferências de e-mail</emailPreferences> para escolher quais e-mails você deseja receber ou <unsubscribe>cancele a inscrição</unsubscribe> de todos os e-mails.",
+    "ro": "Actualizează-ți <emailPreferences>preferințele de e-mail</emailPreferences> pentru a alege ce e-mailuri primești sau pentru a te <unsubscribe>dezabona</unsubscribe> de la toate e-mailurile.",
+    "ru": "Обновите <emailPreferences>настройки электронной почты</emailPreferences>, чтобы выбрать, какие письма получать, или <unsubscribe>отмените подписку</unsubscribe> на все рассылки.",
+    "es": "Actualiza tus <emailPreferences>preferencias de correo electrónico</emailPreferences> para elegir qué correos electrónicos deseas recibir o para <unsubscribe>cancelar la suscripción</unsubscribe> a todos los correos electrónicos.",
+    "es-419": "Actualiza tus <emailPreferences>preferencias de correo electrónico</emailPreferences> para elegir qué mensajes quieres recibir o <unsubscribe>cancelar tu suscripción</unsubscribe> de todos los correos.",
+    "sv": "Uppdatera dina <emailPreferences>e-postinställningar</emailPreferences> för att välja vilka e-postmeddelanden du får eller <unsubscribe>avsluta</unsubscribe> alla prenumerationer.",
+    "th": "อัปเดต <emailPreferences>การตั้งค่าอีเมล</emailPreferences>เพื่อเลือกอีเมลที่คุณต้องการรับหรือ <unsubscribe>ยกเลิกการสมัคร</unsubscribe>รับอีเมลทั้งหมด",
+    "tr": "<emailPreferences>E-posta tercihlerinizi</emailPreferences> güncelleyerek hangi e-postaları alacağınızı belirleyebilir ya da tüm e-posta <unsubscribe>aboneliklerinden çıkabilirsiniz</unsubscribe>.",
+    "uk": "Оновіть <emailPreferences>налаштування електронних листів</emailPreferences>, щоб вибрати, які електронні листи отримувати, або <unsubscribe>відмовитися від підписки</unsubscribe> на всі електронні листи.",
+    "vi": "Cập nhật <emailPreferences>tùy chọn email</emailPreferences> của bạn để chọn email bạn nhận được hoặc <unsubscribe>hủy đăng ký</unsubscribe> khỏi tất cả email.",
+}
+
+# Sentence breaks become line breaks and the final full stop is dropped, as the footer shows it
+_FOOTER_APP_LINES_HTML = {loc: line.replace(". ", "<br />").replace(".", "") for loc, line in FOOTER_APP_LINES.items()}
+
+# The preference/unsubscribe tags become links at generation time, so the template needs no replace chain
+_FOOTER_PREFS_LINKS = {
+    "<emailPreferences>": '<a href="{{snippets.vio_notification_preferences}}" style="color:inherit;text-decoration:underline !important" target="_blank">',
+    "</emailPreferences>": "</a>",
+    "<unsubscribe>": '<a href="{{snippets.vio_notification_preferences_unsubscribe}}" class="untracked" style="color:inherit;text-decoration:underline !important" target="_blank">',
+    "</unsubscribe>": "</a>",
+}
+_FOOTER_PREFS_TAG_RE = re.compile("|".join(map(re.escape, _FOOTER_PREFS_LINKS)))
+_FOOTER_PREFS_HTML = {
+    loc: _FOOTER_PREFS_TAG_RE.sub(lambda m: _FOOTER_PREFS_LINKS[m.group()], text)
+    for loc, text in FOOTER_PREFS_TEXTS.items()
+}
+
+
+def build_footer_capture(key: str, texts: dict[str, str], locales: list[str]) -> str:
+    """{% capture key %} for a built-in footer string, branching only on the built locales
+    (a plain capture when they all share the English text, e.g. en_only)."""
+    en_val = texts["en"]
+    return _locale_capture(key, en_val, locales, [texts.get(loc, en_val) for loc in locales])
 
 
 # Locale derivation block for Customer.io subject/preheader fields (self-contained, no body dependencies)
-LOCALE_KEY_BLOCK = r'''{%- assign lang = customer.language | default: "en" | downcase | replace: "_", "-" -%}
+# customer.language -> locale_key rules, in match order. Regional/script subtags can only match when
+# lang contains "-", so the common bare codes (en, de, fr, ...) skip straight to the language aliases.
+_LOCALE_SUBTAG_RULES: tuple[tuple[tuple[str, ...], str], ...] = (
+    (("zh-hk", "zh-hant-hk"), "zh-hk"),
+    (("zh-tw", "zh-hant"), "zh-tw"),
+    (("zh-cn", "zh-sg", "zh-hans"), "zh-cn"),
+    (("fr-ca",), "fr-ca"),
+    (("pt-br",), "pt-br"),
+    (("pt-pt",), "pt"),
+    (("en-gb",), "en-gb"),
+)
+_LOCALE_ALIAS_RULES: tuple[tuple[str, str], ...] = (
+    ('lang2 == "tl" or lang contains "fil"', "fil"),
+    ('lang2 == "nb" or lang2 == "nn"', "no"),
+)
+
+# Countries whose bare "es" speakers get Latin American Spanish (es-419)
+LATAM_COUNTRIES = ("MX", "AR", "CO", "CL", "PE", "VE", "EC", "GT", "HN", "SV", "NI", "PA", "PR", "DO", "CR", "BO", "PY", "UY", "CU")
+
+
+def _locale_key_ladder(rules: list[tuple[str, str]], first: str, indent: str = "") -> str:
+    """Liquid if/elsif lines assigning locale_key for each (condition, locale) rule."""
+    return "\n".join(
+        f'{indent}{{%- {first if i == 0 else "elsif"} {cond} -%}}{{%- assign locale_key = "{key}" -%}}'
+        for i, (cond, key) in enumerate(rules)
+    )
+
+
+LOCALE_KEY_BLOCK = (
+    r'''{%- assign lang = customer.language | default: "en" | downcase | replace: "_", "-" -%}
 {%- assign lang2 = lang | slice: 0, 2 -%}
 {%- assign locale_key = lang2 -%}
 {%- assign country = customer.country_code | default: customer.country | default: "" | upcase | slice: 0, 2 -%}
 {%- if lang2 == "iw" -%}{%- assign locale_key = "he" -%}{%- endif -%}
-{%- if lang contains "zh-hk" or lang contains "zh-hant-hk" -%}{%- assign locale_key = "zh-hk" -%}
-{%- elsif lang contains "zh-tw" or lang contains "zh-hant" -%}{%- assign locale_key = "zh-tw" -%}
-{%- elsif lang contains "zh-cn" or lang contains "zh-sg" or lang contains "zh-hans" -%}{%- assign locale_key = "zh-cn" -%}
-{%- elsif lang contains "fr-ca" -%}{%- assign locale_key = "fr-ca" -%}
-{%- elsif lang contains "pt-br" -%}{%- assign locale_key = "pt-br" -%}
-{%- elsif lang contains "pt-pt" -%}{%- assign locale_key = "pt" -%}
-{%- elsif lang contains "en-gb" -%}{%- assign locale_key = "en-gb" -%}
-{%- elsif lang2 == "es" and lang contains "-" and lang != "es-es" -%}{%- assign locale_key = "es-419" -%}
-{%- elsif lang2 == "tl" or lang contains "fil" -%}{%- assign locale_key = "fil" -%}
-{%- elsif lang2 == "nb" or lang2 == "nn" -%}{%- assign locale_key = "no" -%}
+{%- if lang contains "-" -%}
+'''
+    + _locale_key_ladder(
+        [(" or ".join(f'lang contains "{tag}"' for tag in tags), key) for tags, key in _LOCALE_SUBTAG_RULES]
+        + [('lang2 == "es" and lang != "es-es"', "es-419")]
+        + list(_LOCALE_ALIAS_RULES),
+        "if",
+        indent="  ",
+    )
+    + "\n  {%- endif -%}\n"
+    + _locale_key_ladder(list(_LOCALE_ALIAS_RULES), "elsif")
+    + r'''
 {%- endif -%}
 {%- assign is_portuguese = false -%}
 {%- if lang2 == "pt" or lang contains "portuguese" -%}{%- assign is_portuguese = true -%}{%- endif -%}
@@ -511,14 +862,14 @@ LOCALE_KEY_BLOCK = r'''{%- assign lang = customer.language | default: "en" | dow
   {%- else -%}{%- assign locale_key = "pt-br" -%}
   {%- endif -%}
 {%- elsif lang2 == "es" and locale_key == "es" -%}
-  {%- assign latam_countries = "MX,AR,CO,CL,PE,VE,EC,GT,HN,SV,NI,PA,PR,DO,CR,BO,PY,UY,CU" | split: "," -%}
-  {%- assign is_latam = false -%}
-  {%- for cc in latam_countries -%}{%- if country == cc -%}{%- assign is_latam = true -%}{%- break -%}{%- endif -%}{%- endfor -%}
-  {%- if is_latam -%}{%- assign locale_key = "es-419" -%}{%- endif -%}
+  {%- case country -%}{%- when '''
+    + ", ".join(f'"{cc}"' for cc in LATAM_COUNTRIES)
+    + r''' -%}{%- assign locale_key = "es-419" -%}{%- endcase -%}
 {%- elsif lang2 == "en" and locale_key == "en" and country == "GB" -%}{%- assign locale_key = "en-gb" -%}
 {%- elsif lang2 == "fr" and locale_key == "fr" and country == "CA" -%}{%- assign locale_key = "fr-ca" -%}
 {%- endif -%}
 '''
+)
 
 
 def build_customerio_subject_preheader_snippets(
@@ -617,7 +968,7 @@ def build_rows_below_image(translations: dict[str, dict[str, str]], structure: d
     has_body1 = "body_1" in translations
     has_body2 = "body_2" in translations
     has_cta = "cta_text" in translations
-    cta_link = _normalise_url(structure.get("cta_link") or "")
+    cta_link = _normalise_url(structure.get("cta_link", ""))
     cta_alias = (structure.get("cta_alias") or "hero-cta").strip()
     parts = []
     if has_body1 or has_body2:
@@ -653,28 +1004,25 @@ def build_app_download_settings(structure: dict[str, str]) -> str:
 '''
 
 
-def build_app_download_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
-    """Optional app download module: card with headline and two store buttons with ratings side-by-side.
-    Rendered only when app_download_title exists. Colour from app_download_colour (set at top); text colour auto-adapts."""
-    if "app_download_title" not in translations:
-        return ""
-    app_rating = (structure.get("app_store_rating") or "4.9/5 · 8,000+ reviews").strip()
-    google_rating = (structure.get("google_play_rating") or "4.6/5 · 11,000+ reviews").strip()
-    star_url = "https://price-watch-email-images-explicit-prod-master.s3.eu-west-1.amazonaws.com/199cd19b/images/star-yellow.png"
-    star_row = f'''<img alt="★" height="12" src="{star_url}" style="display:inline-block;outline:none;border:none;text-decoration:none;padding-right:2px" width="12"/>''' * 5
-    return f'''{{%- if app_download_title != blank -%}}
+# Five yellow stars shown above each store rating in the app download module
+_APP_RATING_STAR_URL = "https://price-watch-email-images-explicit-prod-master.s3.eu-west-1.amazonaws.com/199cd19b/images/star-yellow.png"
+_APP_RATING_STAR_ROW = f'''<img alt="★" height="12" src="{_APP_RATING_STAR_URL}" style="display:inline-block;outline:none;border:none;text-decoration:none;padding-right:2px" width="12"/>''' * 5
+
+
+# Split once into literal segments; only the two store ratings vary per call
+_APP_DOWNLOAD_SEGMENTS, _APP_DOWNLOAD_SLOTS = _compile_template(r'''{%- if app_download_title != blank -%}
 <tr><td style="padding:0;vertical-align:top;">
-<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" class="email-app-module-outer" style="width:100%;margin-top:{{{{ token_space_600 }}}};">
+<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" class="email-app-module-outer" style="width:100%;margin-top:{{ token_space_600 }};">
   <tbody>
     <tr>
       <td align="center" style="padding:0;">
-        <table align="center" width="588" border="0" cellpadding="0" cellspacing="0" role="presentation" class="email-app-card" style="width:588px;max-width:100%;background-color:{{{{ app_download_colour }}}};padding:{{{{ token_space_600 }}}} {{{{ token_space_900 }}}};color:{{{{ app_download_text_colour }}}};border-radius:{{{{ token_radius_module }}}};margin:0 auto {{{{ token_space_600 }}}} auto;text-align:left;box-sizing:border-box">
+        <table align="center" width="588" border="0" cellpadding="0" cellspacing="0" role="presentation" class="email-app-card" style="width:588px;max-width:100%;background-color:{{ app_download_colour }};padding:{{ token_space_600 }} {{ token_space_900 }};color:{{ app_download_text_colour }};border-radius:{{ token_radius_module }};margin:0 auto {{ token_space_600 }} auto;text-align:left;box-sizing:border-box">
           <tbody>
             <tr>
               <td style="font-family:Campton, Circular, Helvetica, Arial, sans-serif;">
-                <a href="{{{{ app_deeplink_url }}}}" data-cio-tag="AppBanner-emailPriceAlertBannerTitle" style="text-decoration:none;color:{{{{ app_download_text_colour }}}}">
-                  <p style="font-size:20px;line-height:28px;font-weight:600;letter-spacing:normal;font-family:{{{{ token_font_stack }}}};text-align:left;margin:0;color:{{{{ app_download_text_colour }}}};padding-top:0;padding-bottom:{{{{ token_space_400 }}}};padding-right:0;padding-left:0;direction:{{{{ dir }}}};unicode-bidi:plaintext;">
-                    {{{{ app_download_title | strip }}}}
+                <a href="{{ app_deeplink_url }}" data-cio-tag="AppBanner-emailPriceAlertBannerTitle" style="text-decoration:none;color:{{ app_download_text_colour }}">
+                  <p style="font-size:20px;line-height:28px;font-weight:600;letter-spacing:normal;font-family:{{ token_font_stack }};text-align:left;margin:0;color:{{ app_download_text_colour }};padding-top:0;padding-bottom:{{ token_space_400 }};padding-right:0;padding-left:0;direction:{{ dir }};unicode-bidi:plaintext;">
+                    {{ app_download_title | strip }}
                   </p>
                 </a>
                 <table role="presentation" width="100%" border="0" cellpadding="0" cellspacing="0" class="email-app-stores" style="border-collapse:collapse;width:100%">
@@ -683,14 +1031,14 @@ def build_app_download_module(translations: dict[str, dict[str, str]], structure
                       <table role="presentation" border="0" cellpadding="0" cellspacing="0" style="border-collapse:collapse">
                         <tr>
                           <td valign="middle" style="padding:0;vertical-align:middle">
-                            <a href="{{{{ app_deeplink_url }}}}" data-cio-tag="AppBanner-apple-store-img" style="display:inline-block;text-decoration:none">
-                              <img alt="Download on App Store" src="{{{{ app_store_badge_url }}}}" style="display:block;outline:none;border:none;text-decoration:none;max-height:40px" height="40"/>
+                            <a href="{{ app_deeplink_url }}" data-cio-tag="AppBanner-apple-store-img" style="display:inline-block;text-decoration:none">
+                              <img alt="Download on App Store" src="{{ app_store_badge_url }}" style="display:block;outline:none;border:none;text-decoration:none;max-height:40px" height="40"/>
                             </a>
                           </td>
                           <td valign="middle" style="padding-left:12px;vertical-align:middle">
                             <table role="presentation" border="0" cellpadding="0" cellspacing="0" style="border-collapse:collapse">
-                              <tr><td style="padding:0">{star_row}</td></tr>
-                              <tr><td style="padding:2px 0 0 0;font-size:12px;line-height:16px;font-weight:450;font-family:{{{{ token_font_stack }}}};color:{{{{ app_download_text_colour }}}};letter-spacing:normal;direction:{{{{ dir }}}};unicode-bidi:plaintext;">{_html_escape(app_rating)}</td></tr>
+                              <tr><td style="padding:0">''' + _APP_RATING_STAR_ROW + r'''</td></tr>
+                              <tr><td style="padding:2px 0 0 0;font-size:12px;line-height:16px;font-weight:450;font-family:{{ token_font_stack }};color:{{ app_download_text_colour }};letter-spacing:normal;direction:{{ dir }};unicode-bidi:plaintext;">{{ APP_RATING }}</td></tr>
                             </table>
                           </td>
                         </tr>
@@ -700,14 +1048,14 @@ def build_app_download_module(translations: dict[str, dict[str, str]], structure
                       <table role="presentation" border="0" cellpadding="0" cellspacing="0" style="border-collapse:collapse">
                         <tr>
                           <td valign="middle" style="padding:0;vertical-align:middle">
-                            <a href="{{{{ app_deeplink_url }}}}" data-cio-tag="AppBanner-google-store-img" style="display:inline-block;text-decoration:none">
-                              <img alt="Get it on Google Play" src="{{{{ google_play_badge_url }}}}" style="display:block;outline:none;border:none;text-decoration:none;max-height:40px" height="40"/>
+                            <a href="{{ app_deeplink_url }}" data-cio-tag="AppBanner-google-store-img" style="display:inline-block;text-decoration:none">
+                              <img alt="Get it on Google Play" src="{{ google_play_badge_url }}" style="display:block;outline:none;border:none;text-decoration:none;max-height:40px" height="40"/>
                             </a>
                           </td>
                           <td valign="middle" style="padding-left:12px;vertical-align:middle">
                             <table role="presentation" border="0" cellpadding="0" cellspacing="0" style="border-collapse:collapse">
-                              <tr><td style="padding:0">{star_row}</td></tr>
-                              <tr><td style="padding:2px 0 0 0;font-size:12px;line-height:16px;font-weight:450;font-family:{{{{ token_font_stack }}}};color:{{{{ app_download_text_colour }}}};letter-spacing:normal;direction:{{{{ dir }}}};unicode-bidi:plaintext;">{_html_escape(google_rating)}</td></tr>
+                              <tr><td style="padding:0">''' + _APP_RATING_STAR_ROW + r'''</td></tr>
+                              <tr><td style="padding:2px 0 0 0;font-size:12px;line-height:16px;font-weight:450;font-family:{{ token_font_stack }};color:{{ app_download_text_colour }};letter-spacing:normal;direction:{{ dir }};unicode-bidi:plaintext;">{{ GOOGLE_RATING }}</td></tr>
                             </table>
                           </td>
                         </tr>
@@ -724,7 +1072,21 @@ def build_app_download_module(translations: dict[str, dict[str, str]], structure
   </tbody>
 </table>
 </td></tr>
-{{%- endif -%}}'''
+{%- endif -%}''', ("{{ APP_RATING }}", "{{ GOOGLE_RATING }}"))
+
+
+def build_app_download_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
+    """Optional app download module: card with headline and two store buttons with ratings side-by-side.
+    Rendered only when app_download_title exists. Colour from app_download_colour (set at top); text colour auto-adapts."""
+    if "app_download_title" not in translations:
+        return ""
+    app_rating = (structure.get("app_store_rating") or "4.9/5 · 8,000+ reviews").strip()
+    google_rating = (structure.get("google_play_rating") or "4.6/5 · 11,000+ reviews").strip()
+    return "".join(_template_parts(
+        _APP_DOWNLOAD_SEGMENTS,
+        _APP_DOWNLOAD_SLOTS,
+        {"{{ APP_RATING }}": _html_escape(app_rating), "{{ GOOGLE_RATING }}": _html_escape(google_rating)},
+    ))
 
 
 _PLACEHOLDER_HOTEL_IMAGE = "https://userimg-assets.customeriomail.com/images/client-env-124967/1746098547647_hotel_card_3_01JT5SAV0XEHV7NKYWXWKKM4RB.png"
@@ -938,27 +1300,14 @@ def _build_hotel_reco_preview_html(structure: dict[str, str] | None = None) -> s
 </td></tr>'''
 
 
-def build_hero_two_column_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
-    """Optional two-column feature module: 4 alternating text/image blocks + CTA.
-    Rendered only when hero_two_col_body_1_h2 exists. Uses design tokens for styling.
-    All feature images are clickable (image_deeplink, cta_link, or fallback)."""
-    if "hero_two_col_body_1_h2" not in translations:
-        return ""
-    img1 = _normalise_url(structure.get("hero_two_col_image_1_url") or "")
-    img2 = _normalise_url(structure.get("hero_two_col_image_2_url") or "")
-    img3 = _normalise_url(structure.get("hero_two_col_image_3_url") or "")
-    img4 = _normalise_url(structure.get("hero_two_col_image_4_url") or "")
-    img_link = _image_link(structure)
-    cta_link = _normalise_url(structure.get("cta_link") or "")
-    cta_alias = (structure.get("cta_alias") or "hero-two-col-cta").strip()
-    # Typography: Campton, 16px, line-height 24px, letter-spacing 0.01em, #0F0E0F; horizontal align (left/right for RTL), vertically centred via valign
-    text_style = "margin:0 0 12px 0;font-family:{{ token_font_stack }};font-weight:700;font-size:16px;line-height:24px;letter-spacing:0.01em;color:{{ token_text_primary }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;"
-    body_style = "margin:0;font-family:{{ token_font_stack }};font-weight:400;font-size:16px;line-height:24px;letter-spacing:0.01em;color:{{ token_text_primary }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;"
-    cta_href = _html_escape(cta_link) if cta_link else "#"
-    cta_tag = _html_escape(cta_alias)
-    return f'''{{%- if hero_two_col_body_1_h2 != blank -%}}
+# Typography: Campton, 16px, line-height 24px, letter-spacing 0.01em, #0F0E0F; horizontal align (left/right for RTL), vertically centred via valign
+_HERO_TWO_COL_TEXT_STYLE = "margin:0 0 12px 0;font-family:{{ token_font_stack }};font-weight:700;font-size:16px;line-height:24px;letter-spacing:0.01em;color:{{ token_text_primary }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;"
+_HERO_TWO_COL_BODY_STYLE = "margin:0;font-family:{{ token_font_stack }};font-weight:400;font-size:16px;line-height:24px;letter-spacing:0.01em;color:{{ token_text_primary }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;"
+
+# Split once, with the fixed styles filled in at import; only image URLs and the CTA vary per call
+_HERO_TWO_COL_SEGMENTS, _HERO_TWO_COL_SLOTS = _fill_template(*_compile_template(r'''{%- if hero_two_col_body_1_h2 != blank -%}
 <tr><td style="padding:0;vertical-align:top;">
-<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" class="email-feature-module-outer" style="width:100%;margin-top:{{{{ token_space_900 }}}}">
+<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" class="email-feature-module-outer" style="width:100%;margin-top:{{ token_space_900 }}">
   <tbody>
     <tr>
       <td>
@@ -967,15 +1316,15 @@ def build_hero_two_column_module(translations: dict[str, dict[str, str]], struct
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 20px 32px 0;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td>
-                  <h2 style="{text_style}">{{{{ hero_two_col_body_1_h2 | strip }}}}</h2>
-                  <p style="{body_style}">{{{{ hero_two_col_body_1_copy | strip }}}}</p>
+                  <h2 style="{{ TEXT_STYLE }}">{{ hero_two_col_body_1_h2 | strip }}</h2>
+                  <p style="{{ BODY_STYLE }}">{{ hero_two_col_body_1_copy | strip }}</p>
                 </td></tr>
               </table>
             </td>
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 0 32px 20px;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td align="center">
-                  <a href="{_html_escape(img_link)}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{_html_escape(img1)}" alt="{{{{ hero_two_col_body_1_h2 | strip }}}}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
+                  <a href="{{ IMG_LINK }}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{{ IMG_1 }}" alt="{{ hero_two_col_body_1_h2 | strip }}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
                 </td></tr>
               </table>
             </td>
@@ -984,15 +1333,15 @@ def build_hero_two_column_module(translations: dict[str, dict[str, str]], struct
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 20px 32px 0;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td align="center">
-                  <a href="{_html_escape(img_link)}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{_html_escape(img2)}" alt="{{{{ hero_two_col_body_2_h2 | strip }}}}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
+                  <a href="{{ IMG_LINK }}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{{ IMG_2 }}" alt="{{ hero_two_col_body_2_h2 | strip }}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
                 </td></tr>
               </table>
             </td>
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 0 32px 20px;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td>
-                  <h2 style="{text_style}">{{{{ hero_two_col_body_2_h2 | strip }}}}</h2>
-                  <p style="{body_style}">{{{{ hero_two_col_body_2_copy | strip }}}}</p>
+                  <h2 style="{{ TEXT_STYLE }}">{{ hero_two_col_body_2_h2 | strip }}</h2>
+                  <p style="{{ BODY_STYLE }}">{{ hero_two_col_body_2_copy | strip }}</p>
                 </td></tr>
               </table>
             </td>
@@ -1001,15 +1350,15 @@ def build_hero_two_column_module(translations: dict[str, dict[str, str]], struct
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 20px 32px 0;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td>
-                  <h2 style="{text_style}">{{{{ hero_two_col_body_3_h2 | strip }}}}</h2>
-                  <p style="{body_style}">{{{{ hero_two_col_body_3_copy | strip }}}}</p>
+                  <h2 style="{{ TEXT_STYLE }}">{{ hero_two_col_body_3_h2 | strip }}</h2>
+                  <p style="{{ BODY_STYLE }}">{{ hero_two_col_body_3_copy | strip }}</p>
                 </td></tr>
               </table>
             </td>
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 0 32px 20px;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td align="center">
-                  <a href="{_html_escape(img_link)}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{_html_escape(img3)}" alt="{{{{ hero_two_col_body_3_h2 | strip }}}}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
+                  <a href="{{ IMG_LINK }}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{{ IMG_3 }}" alt="{{ hero_two_col_body_3_h2 | strip }}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
                 </td></tr>
               </table>
             </td>
@@ -1018,24 +1367,24 @@ def build_hero_two_column_module(translations: dict[str, dict[str, str]], struct
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 20px 0 0;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td align="center">
-                  <a href="{_html_escape(img_link)}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{_html_escape(img4)}" alt="{{{{ hero_two_col_body_4_h2 | strip }}}}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
+                  <a href="{{ IMG_LINK }}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{{ IMG_4 }}" alt="{{ hero_two_col_body_4_h2 | strip }}" width="260" height="180" style="display:block;max-width:100%;height:auto;" /></a>
                 </td></tr>
               </table>
             </td>
             <td width="50%" valign="middle" class="email-feature-col" style="padding:0 0 0 20px;vertical-align:middle;">
               <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
                 <tr><td>
-                  <h2 style="{text_style}">{{{{ hero_two_col_body_4_h2 | strip }}}}</h2>
-                  <p style="{body_style}">{{{{ hero_two_col_body_4_copy | strip }}}}</p>
+                  <h2 style="{{ TEXT_STYLE }}">{{ hero_two_col_body_4_h2 | strip }}</h2>
+                  <p style="{{ BODY_STYLE }}">{{ hero_two_col_body_4_copy | strip }}</p>
                 </td></tr>
               </table>
             </td>
           </tr>
         </table>
-        <table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="email-hero-two-col-cta-wrap" style="width:600px;max-width:100%;margin-top:{{{{ token_space_900 }}}};">
+        <table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="email-hero-two-col-cta-wrap" style="width:600px;max-width:100%;margin-top:{{ token_space_900 }};">
           <tr>
-            <td class="email-hero-two-col-cta-cell" style="padding:{{{{ token_space_600 }}}} 0 0 0;width:600px;">
-              <a href="{cta_href}" target="_blank" data-cio-tag="{cta_tag}" class="email-hero-two-col-cta" style="display:block;width:600px;max-width:100%;min-height:52px;box-sizing:border-box;background:{{{{ token_cta_bg }}}};color:{{{{ token_text_on_brand }}}};text-align:center;font-weight:600;font-size:16px;line-height:20px;padding:{{{{ token_space_400 }}}} 0;border-radius:8px;border-top:1.5px solid #000000;font-family:{{{{ token_font_stack }}}};text-decoration:none;">{{{{ hero_two_col_cta_text | strip }}}}</a>
+            <td class="email-hero-two-col-cta-cell" style="padding:{{ token_space_600 }} 0 0 0;width:600px;">
+              <a href="{{ CTA_HREF }}" target="_blank" data-cio-tag="{{ CTA_TAG }}" class="email-hero-two-col-cta" style="display:block;width:600px;max-width:100%;min-height:52px;box-sizing:border-box;background:{{ token_cta_bg }};color:{{ token_text_on_brand }};text-align:center;font-weight:600;font-size:16px;line-height:20px;padding:{{ token_space_400 }} 0;border-radius:8px;border-top:1.5px solid #000000;font-family:{{ token_font_stack }};text-decoration:none;">{{ hero_two_col_cta_text | strip }}</a>
             </td>
           </tr>
         </table>
@@ -1044,51 +1393,55 @@ def build_hero_two_column_module(translations: dict[str, dict[str, str]], struct
   </tbody>
 </table>
 </td></tr>
-{{%- endif -%}}'''
+{%- endif -%}''', (
+    "{{ TEXT_STYLE }}", "{{ BODY_STYLE }}", "{{ IMG_LINK }}",
+    "{{ IMG_1 }}", "{{ IMG_2 }}", "{{ IMG_3 }}", "{{ IMG_4 }}", "{{ CTA_HREF }}", "{{ CTA_TAG }}",
+)), {"{{ TEXT_STYLE }}": _HERO_TWO_COL_TEXT_STYLE, "{{ BODY_STYLE }}": _HERO_TWO_COL_BODY_STYLE})
 
 
-def build_usp_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
-    """USP module: title + 3 feature rows (icon, heading, copy). width 600, padding s800, gap 24, border-radius lg.
-    Icons are clickable (image_deeplink, cta_link, or fallback)."""
-    if "usp_title" not in translations:
+def build_hero_two_column_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
+    """Optional two-column feature module: 4 alternating text/image blocks + CTA.
+    Rendered only when hero_two_col_body_1_h2 exists. Uses design tokens for styling.
+    All feature images are clickable (image_deeplink, cta_link, or fallback)."""
+    if "hero_two_col_body_1_h2" not in translations:
         return ""
-    icon1 = _normalise_url(structure.get("usp_1_icon_url") or "")
-    icon2 = _normalise_url(structure.get("usp_2_icon_url") or "")
-    icon3 = _normalise_url(structure.get("usp_3_icon_url") or "")
+    img1 = _normalise_url(structure.get("hero_two_col_image_1_url", ""))
+    img2 = _normalise_url(structure.get("hero_two_col_image_2_url", ""))
+    img3 = _normalise_url(structure.get("hero_two_col_image_3_url", ""))
+    img4 = _normalise_url(structure.get("hero_two_col_image_4_url", ""))
     img_link = _image_link(structure)
-    # Placeholder icons when none provided (80x80 frame, light purple bg)
-    placeholder = "https://placehold.co/80/f2e5ff/7130c9?text=•"
-    icon1 = icon1 or placeholder
-    icon2 = icon2 or placeholder
-    icon3 = icon3 or placeholder
-
-    def _usp_row(icon_url: str, heading_var: str, copy_var: str) -> str:
-        return f'''            <tr>
-              <td valign="top" style="padding:0 {{{{ token_space_600 }}}} {{{{ token_space_600 }}}} 0;vertical-align:top;width:80px;">
-                <a href="{_html_escape(img_link)}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{_html_escape(icon_url)}" alt="" width="80" height="80" style="display:block;max-width:80px;max-height:80px;object-fit:contain;" /></a>
-              </td>
-              <td valign="top" style="padding:0 0 {{{{ token_space_600 }}}} 0;vertical-align:top;">
-                <p style="margin:0;font-family:{{{{ token_font_stack }}}};font-weight:700;font-size:{{{{ token_font_size_md }}}};line-height:{{{{ token_line_height_lg }}}};letter-spacing:{{{{ token_letter_spacing_md }}}};color:{{{{ token_text_primary }}}};text-align:{{{{ align }}}};direction:{{{{ dir }}}};unicode-bidi:plaintext;">{{{{ {heading_var} | strip }}}}</p>
-                <p style="margin:4px 0 0 0;font-family:{{{{ token_font_stack }}}};font-weight:400;font-size:{{{{ token_font_size_md }}}};line-height:{{{{ token_line_height_lg }}}};letter-spacing:{{{{ token_letter_spacing_md }}}};color:{{{{ token_text_body }}}};text-align:{{{{ align }}}};direction:{{{{ dir }}}};unicode-bidi:plaintext;">{{{{ {copy_var} | strip }}}}</p>
-              </td>
-            </tr>'''
-
-    return f'''{{%- if usp_title != blank -%}}
+    cta_link = _normalise_url(structure.get("cta_link", ""))
+    cta_alias = (structure.get("cta_alias") or "hero-two-col-cta").strip()
+    cta_href = _html_escape(cta_link) if cta_link else "#"
+    cta_tag = _html_escape(cta_alias)
+    return "".join(_template_parts(_HERO_TWO_COL_SEGMENTS, _HERO_TWO_COL_SLOTS, {
+        "{{ IMG_LINK }}": _html_escape(img_link),
+        "{{ IMG_1 }}": _html_escape(img1),
+        "{{ IMG_2 }}": _html_escape(img2),
+        "{{ IMG_3 }}": _html_escape(img3),
+        "{{ IMG_4 }}": _html_escape(img4),
+        "{{ CTA_HREF }}": cta_href,
+        "{{ CTA_TAG }}": cta_tag,
+    }))
+
+
+# USP module shell and feature row, split once into literal segments
+_USP_SEGMENTS, _USP_SLOTS = _compile_template(r'''{%- if usp_title != blank -%}
 <tr><td style="padding:0;vertical-align:top;">
-<table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="email-usp-module" style="width:600px;max-width:100%;margin-top:{{{{ token_space_600 }}}};background-color:{{{{ token_neutral_c050 }}}};padding:{{{{ token_space_800 }}}};border-radius:{{{{ token_radius_module }}}};box-sizing:border-box;">
+<table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="email-usp-module" style="width:600px;max-width:100%;margin-top:{{ token_space_600 }};background-color:{{ token_neutral_c050 }};padding:{{ token_space_800 }};border-radius:{{ token_radius_module }};box-sizing:border-box;">
   <tbody>
     <tr>
-      <td align="center" style="padding:0 0 {{{{ token_space_600 }}}} 0;">
-        <p style="margin:0;font-family:{{{{ token_font_stack }}}};font-weight:700;font-size:24px;line-height:32px;letter-spacing:{{{{ token_letter_spacing_md }}}};color:{{{{ token_accent }}}};text-align:center;direction:{{{{ dir }}}};unicode-bidi:plaintext;">{{{{ usp_title | strip }}}}</p>
+      <td align="center" style="padding:0 0 {{ token_space_600 }} 0;">
+        <p style="margin:0;font-family:{{ token_font_stack }};font-weight:700;font-size:24px;line-height:32px;letter-spacing:{{ token_letter_spacing_md }};color:{{ token_accent }};text-align:center;direction:{{ dir }};unicode-bidi:plaintext;">{{ usp_title | strip }}</p>
       </td>
     </tr>
     <tr>
       <td style="padding:0;">
         <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" style="width:100%;border-collapse:collapse;">
           <tbody>
-{_usp_row(icon1, "usp_1_heading", "usp_1_copy")}
-{_usp_row(icon2, "usp_2_heading", "usp_2_copy")}
-{_usp_row(icon3, "usp_3_heading", "usp_3_copy")}
+{{ ROW_1 }}
+{{ ROW_2 }}
+{{ ROW_3 }}
           </tbody>
         </table>
       </td>
@@ -1096,50 +1449,118 @@ def build_usp_module(translations: dict[str, dict[str, str]], structure: dict[st
   </tbody>
 </table>
 </td></tr>
-{{%- endif -%}}'''
+{%- endif -%}''', ("{{ ROW_1 }}", "{{ ROW_2 }}", "{{ ROW_3 }}"))
+_USP_ROW_SEGMENTS, _USP_ROW_SLOTS = _compile_template(r'''            <tr>
+              <td valign="top" style="padding:0 {{ token_space_600 }} {{ token_space_600 }} 0;vertical-align:top;width:80px;">
+                <a href="{{ IMG_LINK }}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{{ ICON_URL }}" alt="" width="80" height="80" style="display:block;max-width:80px;max-height:80px;object-fit:contain;" /></a>
+              </td>
+              <td valign="top" style="padding:0 0 {{ token_space_600 }} 0;vertical-align:top;">
+                <p style="margin:0;font-family:{{ token_font_stack }};font-weight:700;font-size:{{ token_font_size_md }};line-height:{{ token_line_height_lg }};letter-spacing:{{ token_letter_spacing_md }};color:{{ token_text_primary }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;">{{ HEADING }}</p>
+                <p style="margin:4px 0 0 0;font-family:{{ token_font_stack }};font-weight:400;font-size:{{ token_font_size_md }};line-height:{{ token_line_height_lg }};letter-spacing:{{ token_letter_spacing_md }};color:{{ token_text_body }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;">{{ COPY }}</p>
+              </td>
+            </tr>''', ("{{ IMG_LINK }}", "{{ ICON_URL }}", "{{ HEADING }}", "{{ COPY }}"))
 
 
-def build_usp_feature_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
-    """USP feature module: header + 3 two-column rows (text left, image right). Same content as USP but with larger illustrative images.
-    Images are clickable (image_deeplink, cta_link, or fallback)."""
-    if "usp_feature_title" not in translations:
+# Placeholder icon when none provided (80x80 frame, light purple bg)
+_USP_ICON_PLACEHOLDER = "https://placehold.co/80/f2e5ff/7130c9?text=•"
+
+
+def build_usp_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
+    """USP module: title + 3 feature rows (icon, heading, copy). width 600, padding s800, gap 24, border-radius lg.
+    Icons are clickable (image_deeplink, cta_link, or fallback)."""
+    if "usp_title" not in translations:
         return ""
-    img1 = _normalise_url(structure.get("usp_feature_1_image_url") or "")
-    img2 = _normalise_url(structure.get("usp_feature_2_image_url") or "")
-    img3 = _normalise_url(structure.get("usp_feature_3_image_url") or "")
+    icon1 = _normalise_url(structure.get("usp_1_icon_url", "")) or _USP_ICON_PLACEHOLDER
+    icon2 = _normalise_url(structure.get("usp_2_icon_url", "")) or _USP_ICON_PLACEHOLDER
+    icon3 = _normalise_url(structure.get("usp_3_icon_url", "")) or _USP_ICON_PLACEHOLDER
     img_link = _image_link(structure)
-    placeholder = "https://placehold.co/280x200/fcf7f5/615a56?text=Feature"
-    img1 = img1 or placeholder
-    img2 = img2 or placeholder
-    img3 = img3 or placeholder
 
-    def _feature_row(img_url: str, heading_var: str, copy_var: str) -> str:
-        return f'''          <tr class="email-usp-feature-row">
-            <td width="50%" valign="middle" style="padding:0 20px 32px 0;vertical-align:middle;">
-              <p style="margin:0;font-family:{{{{ token_font_stack }}}};font-weight:700;font-size:{{{{ token_font_size_md }}}};line-height:{{{{ token_line_height_lg }}}};letter-spacing:{{{{ token_letter_spacing_md }}}};color:{{{{ token_text_primary }}}};text-align:{{{{ align }}}};direction:{{{{ dir }}}};unicode-bidi:plaintext;">{{{{ {heading_var} | strip }}}}</p>
-              <p style="margin:8px 0 0 0;font-family:{{{{ token_font_stack }}}};font-weight:400;font-size:{{{{ token_font_size_md }}}};line-height:{{{{ token_line_height_lg }}}};letter-spacing:{{{{ token_letter_spacing_md }}}};color:{{{{ token_text_body }}}};text-align:{{{{ align }}}};direction:{{{{ dir }}}};unicode-bidi:plaintext;">{{{{ {copy_var} | strip }}}}</p>
-            </td>
-            <td width="50%" valign="middle" style="padding:0 0 32px 20px;vertical-align:middle;">
-              <a href="{_html_escape(img_link)}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{_html_escape(img_url)}" alt="" width="280" height="200" style="display:block;max-width:100%;height:auto;border-radius:{{{{ token_radius_module }}}};" /></a>
-            </td>
-          </tr>'''
+    link = _html_escape(img_link)
+
+    def _usp_row(icon_url: str, heading_var: str, copy_var: str) -> list[str]:
+        return _template_parts(
+            _USP_ROW_SEGMENTS,
+            _USP_ROW_SLOTS,
+            {
+                "{{ IMG_LINK }}": link,
+                "{{ ICON_URL }}": _html_escape(icon_url),
+                "{{ HEADING }}": f"{{{{ {heading_var} | strip }}}}",
+                "{{ COPY }}": f"{{{{ {copy_var} | strip }}}}",
+            },
+        )
+
+    return _join_rows(_USP_SEGMENTS, (
+        _usp_row(icon1, "usp_1_heading", "usp_1_copy"),
+        _usp_row(icon2, "usp_2_heading", "usp_2_copy"),
+        _usp_row(icon3, "usp_3_heading", "usp_3_copy"),
+    ))
 
-    return f'''{{%- if usp_feature_title != blank -%}}
+
+# USP feature module shell and two-column row, split once into literal segments
+_USP_FEATURE_SEGMENTS, _USP_FEATURE_SLOTS = _compile_template(r'''{%- if usp_feature_title != blank -%}
 <tr><td style="padding:0;vertical-align:top;">
-<table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="email-usp-feature-module" style="width:600px;max-width:100%;margin-top:{{{{ token_space_600 }}}};background-color:{{{{ token_neutral_c050 }}}};padding:{{{{ token_space_800 }}}};border-radius:{{{{ token_radius_module }}}};box-sizing:border-box;">
+<table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="email-usp-feature-module" style="width:600px;max-width:100%;margin-top:{{ token_space_600 }};background-color:{{ token_neutral_c050 }};padding:{{ token_space_800 }};border-radius:{{ token_radius_module }};box-sizing:border-box;">
   <tbody>
     <tr>
-      <td align="center" colspan="2" style="padding:0 0 {{{{ token_space_600 }}}} 0;">
-        <p style="margin:0;font-family:{{{{ token_font_stack }}}};font-weight:700;font-size:24px;line-height:32px;letter-spacing:{{{{ token_letter_spacing_md }}}};color:{{{{ token_accent }}}};text-align:center;direction:{{{{ dir }}}};unicode-bidi:plaintext;">{{{{ usp_feature_title | strip }}}}</p>
+      <td align="center" colspan="2" style="padding:0 0 {{ token_space_600 }} 0;">
+        <p style="margin:0;font-family:{{ token_font_stack }};font-weight:700;font-size:24px;line-height:32px;letter-spacing:{{ token_letter_spacing_md }};color:{{ token_accent }};text-align:center;direction:{{ dir }};unicode-bidi:plaintext;">{{ usp_feature_title | strip }}</p>
       </td>
     </tr>
-{_feature_row(img1, "usp_feature_1_heading", "usp_feature_1_copy")}
-{_feature_row(img2, "usp_feature_2_heading", "usp_feature_2_copy")}
-{_feature_row(img3, "usp_feature_3_heading", "usp_feature_3_copy")}
+{{ ROW_1 }}
+{{ ROW_2 }}
+{{ ROW_3 }}
   </tbody>
 </table>
 </td></tr>
-{{%- endif -%}}'''
+{%- endif -%}''', ("{{ ROW_1 }}", "{{ ROW_2 }}", "{{ ROW_3 }}"))
+_USP_FEATURE_ROW_SEGMENTS, _USP_FEATURE_ROW_SLOTS = _compile_template(r'''          <tr class="email-usp-feature-row">
+            <td width="50%" valign="middle" style="padding:0 20px 32px 0;vertical-align:middle;">
+              <p style="margin:0;font-family:{{ token_font_stack }};font-weight:700;font-size:{{ token_font_size_md }};line-height:{{ token_line_height_lg }};letter-spacing:{{ token_letter_spacing_md }};color:{{ token_text_primary }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;">{{ HEADING }}</p>
+              <p style="margin:8px 0 0 0;font-family:{{ token_font_stack }};font-weight:400;font-size:{{ token_font_size_md }};line-height:{{ token_line_height_lg }};letter-spacing:{{ token_letter_spacing_md }};color:{{ token_text_body }};text-align:{{ align }};direction:{{ dir }};unicode-bidi:plaintext;">{{ COPY }}</p>
+            </td>
+            <td width="50%" valign="middle" style="padding:0 0 32px 20px;vertical-align:middle;">
+              <a href="{{ IMG_LINK }}" target="_blank" style="display:block;text-decoration:none;border:0;outline:none;"><img src="{{ IMG_URL }}" alt="" width="280" height="200" style="display:block;max-width:100%;height:auto;border-radius:{{ token_radius_module }};" /></a>
+            </td>
+          </tr>''', ("{{ IMG_LINK }}", "{{ IMG_URL }}", "{{ HEADING }}", "{{ COPY }}"))
+
+
+# Placeholder image when none provided
+_USP_FEATURE_IMAGE_PLACEHOLDER = "https://placehold.co/280x200/fcf7f5/615a56?text=Feature"
+
+
+def build_usp_feature_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
+    """USP feature module: header + 3 two-column rows (text left, image right). Same content as USP but with larger illustrative images.
+    Images are clickable (image_deeplink, cta_link, or fallback)."""
+    if "usp_feature_title" not in translations:
+        return ""
+    img1 = _normalise_url(structure.get("usp_feature_1_image_url", "")) or _USP_FEATURE_IMAGE_PLACEHOLDER
+    img2 = _normalise_url(structure.get("usp_feature_2_image_url", "")) or _USP_FEATURE_IMAGE_PLACEHOLDER
+    img3 = _normalise_url(structure.get("usp_feature_3_image_url", "")) or _USP_FEATURE_IMAGE_PLACEHOLDER
+    img_link = _image_link(structure)
+
+    link = _html_escape(img_link)
+
+    def _feature_row(img_url: str, heading_var: str, copy_var: str) -> list[str]:
+        return _template_parts(
+            _USP_FEATURE_ROW_SEGMENTS,
+            _USP_FEATURE_ROW_SLOTS,
+            {
+                "{{ IMG_LINK }}": link,
+                "{{ IMG_URL }}": _html_escape(img_url),
+                "{{ HEADING }}": f"{{{{ {heading_var} | strip }}}}",
+                "{{ COPY }}": f"{{{{ {copy_var} | strip }}}}",
+            },
+        )
+
+    return _join_rows(_USP_FEATURE_SEGMENTS, (
+        _feature_row(img1, "usp_feature_1_heading", "usp_feature_1_copy"),
+        _feature_row(img2, "usp_feature_2_heading", "usp_feature_2_copy"),
+        _feature_row(img3, "usp_feature_3_heading", "usp_feature_3_copy"),
+    ))
+
+
+# Placeholder image when none provided
+_USP_UI_IMAGE_PLACEHOLDER = "https://placehold.co/280x200/fcf7f5/615a56?text=Image"
 
 
 def build_usp_ui_module(translations: dict[str, dict[str, str]], structure: dict[str, str]) -> str:
@@ -1147,14 +1568,10 @@ def build_usp_ui_module(translations: dict[str, dict[str, str]], structure: dict
     Images are displayed as-is and are clickable (image_deeplink, cta_link, or fallback)."""
     if "usp_ui_title" not in translations:
         return ""
-    img1 = _normalise_url(structure.get("usp_ui_1_image_url") or "")
-    img2 = _normalise_url(structure.get("usp_ui_2_image_url") or "")
-    img3 = _normalise_url(structure.get("usp_ui_3_image_url") or "")
+    img1 = _normalise_url(structure.get("usp_ui_1_image_url", "")) or _USP_UI_IMAGE_PLACEHOLDER
+    img2 = _normalise_url(structure.get("usp_ui_2_image_url", "")) or _USP_UI_IMAGE_PLACEHOLDER
+    img3 = _normalise_url(structure.get("usp_ui_3_image_url", "")) or _USP_UI_IMAGE_PLACEHOLDER
     img_link = _image_link(structure)
-    placeholder = "https://placehold.co/280x200/fcf7f5/615a56?text=Image"
-    img1 = img1 or placeholder
-    img2 = img2 or placeholder
-    img3 = img3 or placeholder
 
     def _ui_row(img_url: str, heading_var: str, copy_var: str, image_first: bool, last_row: bool) -> str:
         gap_bottom = "0" if last_row else "10px"
@@ -1213,38 +1630,54 @@ def build_usp_ui_module(translations: dict[str, dict[str, str]], structure: dict
 {{%- endif -%}}'''
 
 
+# Spellings the UI and CLI actually pass; anything else goes through the case-insensitive fallback
+_BOOL_FLAG_NORM = {"TRUE": "TRUE", "true": "TRUE", "FALSE": "FALSE", "false": "FALSE", "": "TRUE", None: "TRUE"}
+_COLOUR_PRESET_NORM = {"LIGHT": "LIGHT", "light": "LIGHT", "DARK": "DARK", "dark": "DARK", "": "LIGHT", None: "LIGHT"}
+
+
+def _norm_bool_flag(val: str) -> str:
+    norm = _BOOL_FLAG_NORM.get(val)
+    if norm is not None:
+        return norm
+    return "FALSE" if (val or "TRUE").upper() == "FALSE" else "TRUE"
+
+
+def _norm_colour_preset(val: str) -> str:
+    norm = _COLOUR_PRESET_NORM.get(val)
+    if norm is not None:
+        return norm
+    return "DARK" if (val or "LIGHT").upper().strip() == "DARK" else "LIGHT"
+
+
 def build_config_block(
     show_header_logo: str = "TRUE",
     show_footer: str = "TRUE",
     show_terms: str = "TRUE",
     app_download_colour_preset: str = "LIGHT",
 ) -> str:
-    def norm(val: str) -> str:
-        val = (val or "TRUE").upper()
-        return "TRUE" if val not in ("TRUE", "FALSE") else val
-
-    def norm_preset(val: str) -> str:
-        val = (val or "LIGHT").upper().strip()
-        return "DARK" if val == "DARK" else "LIGHT"
-
-    return f'''{{%- assign show_header_logo = "{norm(show_header_logo)}" -%}}
-{{%- assign show_footer = "{norm(show_footer)}" -%}}
-{{%- assign show_terms = "{norm(show_terms)}" -%}}
+    return f'''{{%- assign show_header_logo = "{_norm_bool_flag(show_header_logo)}" -%}}
+{{%- assign show_footer = "{_norm_bool_flag(show_footer)}" -%}}
+{{%- assign show_terms = "{_norm_bool_flag(show_terms)}" -%}}
 {{%- comment -%}} App download colour toggle: write LIGHT or DARK (or override via app_download_colour_preset merge field) {{%- endcomment -%}}
-{{%- assign app_download_colour_toggle = "{norm_preset(app_download_colour_preset)}" -%}}
+{{%- assign app_download_colour_toggle = "{_norm_colour_preset(app_download_colour_preset)}" -%}}
 {{%- assign app_download_colour_preset = app_download_colour_preset | default: app_download_colour_toggle | upcase | strip -%}}'''
 
 
+# Single-pass escapes for values written inside Liquid "..." strings, and link key -> variable name
+_LIQUID_STRING_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+_LINK_VAR_NAME_CHARS = str.maketrans({".": "_", "-": "_"})
+
+
 def _build_hotel_reco_assigns_block(structure: dict[str, str]) -> str:
     """Build Liquid assigns for hotel_reco from CSV structure."""
     headline = (structure.get("hotel_reco_headline") or "Recently viewed hotels in {city}").strip()
     reco_type = (structure.get("hotel_reco_type") or "last_browsed").strip()
     cta_text = (structure.get("hotel_reco_cta_text") or "").strip()
     cta_url = (structure.get("hotel_reco_cta_url") or "").strip()
-    headline_escaped = headline.replace("\\", "\\\\").replace('"', '\\"')
-    reco_type_escaped = reco_type.replace("\\", "\\\\").replace('"', '\\"')
-    cta_text_escaped = cta_text.replace("\\", "\\\\").replace('"', '\\"')
-    cta_url_escaped = cta_url.replace("\\", "\\\\").replace('"', '\\"')
+    headline_escaped = headline.translate(_LIQUID_STRING_ESCAPES)
+    reco_type_escaped = reco_type.translate(_LIQUID_STRING_ESCAPES)
+    cta_text_escaped = cta_text.translate(_LIQUID_STRING_ESCAPES)
+    cta_url_escaped = cta_url.translate(_LIQUID_STRING_ESCAPES)
     return f'''{{%- assign hotel_reco_headline = hotel_reco_headline | default: "{headline_escaped}" -%}}
 {{%- assign hotel_reco_type = hotel_reco_type | default: "{reco_type_escaped}" -%}}
 {{%- assign hotel_reco_cta_text = hotel_reco_cta_text | default: "{cta_text_escaped}" -%}}
@@ -1267,21 +1700,46 @@ DEFAULT_LINKS = {
     "facebook": "https://www.facebook.com/viodotcom",
     "linkedin": "https://www.linkedin.com/company/viodotcom/",
 }
+_DEFAULT_LINKS_VIEW = MappingProxyType(DEFAULT_LINKS)
 
 
-def load_standard_links(config_path: Path | None = None) -> dict[str, str]:
-    """Load links from standard_links.json. Returns DEFAULT_LINKS if file missing or invalid."""
-    import json
-    path = config_path or Path(__file__).parent / "standard_links.json"
-    if not path.exists():
-        return dict(DEFAULT_LINKS)
+@functools.lru_cache(maxsize=8)
+def _read_standard_links(path_str: str, _mtime_ns: int) -> tuple[bool, MappingProxyType] | None:
+    """Parsed links file as (has a "links" section, url per key); None if invalid.
+    Cached per path and mtime so repeated renders skip the read and JSON decode."""
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = json.loads(Path(path_str).read_text(encoding="utf-8"))
         if isinstance(data.get("links"), dict):
-            return {k: v.get("url", v) if isinstance(v, dict) else v for k, v in data["links"].items()}
-        return dict(DEFAULT_LINKS) | {k: v for k, v in data.items() if isinstance(v, str)}
+            return True, MappingProxyType(
+                {k: v.get("url", v) if isinstance(v, dict) else v for k, v in data["links"].items()}
+            )
+        return False, MappingProxyType({k: v for k, v in data.items() if isinstance(v, str)})
     except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def _standard_links_file(config_path: Path | None = None) -> tuple[bool, MappingProxyType] | None:
+    """Cached parse of standard_links.json (or config_path); None when missing or invalid."""
+    path = config_path or Path(__file__).parent / "standard_links.json"
+    if not path.exists():
+        return None
+    return _read_standard_links(str(path), _mtime_ns(path))
+
+
+def load_standard_links(config_path: Path | None = None) -> dict[str, str]:
+    """Load links from standard_links.json. Returns DEFAULT_LINKS if file missing or invalid."""
+    parsed = _standard_links_file(config_path)
+    if parsed is None:
         return dict(DEFAULT_LINKS)
+    has_links_section, links = parsed
+    return dict(links) if has_links_section else DEFAULT_LINKS | links
+
+
+# The four terms captures copied as defaults from full_email_template.liquid (terms_link/privacy_link are added separately)
+_TERMS_DEFAULTS_RE = re.compile(
+    r'(\{%- capture (terms_title|terms_label|privacy_label|terms_desc_text) -%\}.+?\{%- endcapture -%\})',
+    re.DOTALL,
+)
 
 
 def build_terms_defaults_block() -> str:
@@ -1294,13 +1752,14 @@ def build_terms_defaults_block() -> str:
 {%- if terms_label == blank -%}{%- capture terms_label -%}Terms{%- endcapture -%}{%- endif -%}
 {%- if privacy_label == blank -%}{%- capture privacy_label -%}Privacy Policy{%- endcapture -%}{%- endif -%}
 {%- if terms_desc_text == blank -%}{%- capture terms_desc_text -%}This booking is covered by our {terms} and {privacyPolicy}.{%- endcapture -%}{%- endif -%}"""
-    text = liquid_path.read_text(encoding="utf-8")
-    # Extract the 4 captures (excl. terms_link, privacy_link which we add separately)
-    blocks = re.findall(
-        r'(\{%- capture (terms_title|terms_label|privacy_label|terms_desc_text) -%\}.+?\{%- endcapture -%\})',
-        text,
-        re.DOTALL,
-    )
+    return _build_terms_defaults_cached(str(liquid_path), _mtime_ns(liquid_path))
+
+
+@functools.lru_cache(maxsize=4)
+def _build_terms_defaults_cached(liquid_path_str: str, _mtime_ns: int) -> str:
+    """Wrap the 4 extracted captures in blank checks; cached until the liquid file changes."""
+    text = Path(liquid_path_str).read_text(encoding="utf-8")
+    blocks = _TERMS_DEFAULTS_RE.findall(text)
     if len(blocks) != 4:
         return "{%- comment -%}terms defaults fallback{%- endcomment -%}"
     out = []
@@ -1312,28 +1771,18 @@ def build_terms_defaults_block() -> str:
 
 def build_links_block(links: dict[str, str] | None = None) -> str:
     """Build Liquid assigns for standard links. Uses DEFAULT_LINKS for any missing keys."""
-    import json
-    merged = dict(DEFAULT_LINKS)
+    # Only copy DEFAULT_LINKS when there is something to merge into it
+    merged: Mapping[str, str] = _DEFAULT_LINKS_VIEW
     if links:
-        merged.update(links)
-    elif (path := Path(__file__).parent / "standard_links.json").exists():
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            if isinstance(data.get("links"), dict):
-                merged.update({k: v.get("url", v) if isinstance(v, dict) else v for k, v in data["links"].items()})
-            else:
-                merged.update({k: v for k, v in data.items() if isinstance(v, str)})
-        except (json.JSONDecodeError, TypeError):
-            pass
-    lines = []
-    for key, url in merged.items():
-        if not isinstance(url, str):
-            continue
-        # Liquid: escape double quotes in URL
-        escaped = url.replace('\\', '\\\\').replace('"', '\\"')
-        var_name = key.replace(".", "_").replace("-", "_")
-        lines.append(f'{{%- assign link_{var_name} = "{escaped}" -%}}')
-    return "\n".join(lines)
+        merged = DEFAULT_LINKS | links
+    elif (parsed := _standard_links_file()) is not None:
+        merged = DEFAULT_LINKS | parsed[1]
+    # Liquid: escape double quotes in URL; non-string values are skipped
+    return "\n".join([
+        f'{{%- assign link_{key.translate(_LINK_VAR_NAME_CHARS)} = "{url.translate(_LIQUID_STRING_ESCAPES)}" -%}}'
+        for key, url in merged.items()
+        if isinstance(url, str)
+    ])
 
 
 # Placeholder content for module preview (sample text + placeholder images)
@@ -1430,6 +1879,16 @@ _PREVIEW_PLACEHOLDERS = {
     },
 }
 
+# Pre-joined (csv_key, preview_value) rows per module, resolved once at import
+_PREVIEW_ROWS = {
+    mod: [
+        (csv_key, _PREVIEW_PLACEHOLDERS[mod].get(csv_key, _PREVIEW_PLACEHOLDERS[mod].get(csv_key.replace("_", ""), "")))
+        for csv_key, _ in rows
+    ]
+    for mod, rows in MODULE_TEMPLATE_ROWS.items()
+    if mod in _PREVIEW_PLACEHOLDERS
+}
+
 
 def get_module_preview_html(
     modules: list[str],
@@ -1444,6 +1903,32 @@ def get_module_preview_html(
     """
     if not modules:
         return "<p style='padding:20px;color:#615a56;'>Select modules to see a preview.</p>"
+    base = Path(__file__).parent
+    return _module_preview_html_cached(
+        tuple(modules),
+        app_download_colour_preset,
+        design_tokens_brand,
+        include_hotel_reco,
+        (
+            _mtime_ns(_get_design_tokens_path(design_tokens_brand)),
+            _mtime_ns(_get_design_tokens_path("vio")),
+            _mtime_ns(base / "standard_links.json"),
+            _mtime_ns(base / "full_email_template.liquid"),
+            _mtime_ns(base / "modules" / "hotel_reco_grid_4.liquid"),
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _module_preview_html_cached(
+    modules: tuple[str, ...],
+    app_download_colour_preset: str,
+    design_tokens_brand: str,
+    include_hotel_reco: bool,
+    _source_mtimes: tuple[int, ...],
+) -> str:
+    """get_module_preview_html() body. Streamlit reruns ask for the same selection repeatedly, so the
+    rendered HTML is cached per selection and options; _source_mtimes invalidates on file edits."""
     mods = list(modules)
     if include_hotel_reco and "hotel_reco_grid_4" not in mods:
         mods.append("hotel_reco_grid_4")
@@ -1451,47 +1936,42 @@ def get_module_preview_html(
     rows: list[tuple[str, str, int, str]] = []  # (Key, Module, module_index, en)
     module_indices: dict[str, int] = {}
     for mod in mods:
-        if mod not in MODULE_TEMPLATE_ROWS or mod not in _PREVIEW_PLACEHOLDERS:
+        if mod not in _PREVIEW_ROWS:
             continue
         idx = module_indices.get(mod, len(module_indices) + 1)
         module_indices[mod] = idx
-        placeholders = _PREVIEW_PLACEHOLDERS[mod]
-        for csv_key, _ in MODULE_TEMPLATE_ROWS[mod]:
-            val = placeholders.get(csv_key, placeholders.get(csv_key.replace("_", ""), ""))
-            rows.append((csv_key, mod, str(idx), val))
+        str_idx = str(idx)
+        for csv_key, val in _PREVIEW_ROWS[mod]:
+            rows.append((csv_key, mod, str_idx, val))
     if not rows:
         return "<p style='padding:20px;color:#615a56;'>Select modules to see a preview.</p>"
     headers = ["Key", "Module", "module_index", "en"]
     out = [headers] + [[r[0], r[1], r[2], r[3]] for r in rows]
-    writer = csv.StringIO()
-    csv.writer(writer).writerows(out)
-    csv_content = writer.getvalue()
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as f:
-        f.write(csv_content)
-        tmp_path = Path(f.name)
-    try:
-        show_terms = "disclaimer_module" in modules
-        result = generate_template(
-            tmp_path,
-            show_header_logo="FALSE",
-            show_footer="FALSE",
-            show_terms="TRUE" if show_terms else "FALSE",
-            app_download_colour_preset=app_download_colour_preset,
-            design_tokens_brand=design_tokens_brand,
-            include_hotel_reco=include_hotel_reco,
-        )
-        translations, structure = load_translations(tmp_path)
-        html = liquid_to_preview_html(
-            result,
-            translations,
-            structure,
-            show_header_logo=False,
-            show_footer=False,
-            show_terms=show_terms,
-        )
-        return html
-    finally:
-        tmp_path.unlink(missing_ok=True)
+    # Parsed in memory; the CSV round trip keeps the quoting and key mapping identical to an uploaded file
+    buf = StringIO()
+    csv.writer(buf).writerows(out)
+    translations, structure = load_translations(buf)
+    show_terms = "disclaimer_module" in modules
+    result = generate_template(
+        None,
+        show_header_logo="FALSE",
+        show_footer="FALSE",
+        show_terms="TRUE" if show_terms else "FALSE",
+        app_download_colour_preset=app_download_colour_preset,
+        design_tokens_brand=design_tokens_brand,
+        include_locales=["en"],
+        include_hotel_reco=include_hotel_reco,
+        translations=translations,
+        structure=structure,
+    )
+    return liquid_to_preview_html(
+        result,
+        translations,
+        structure,
+        show_header_logo=False,
+        show_footer=False,
+        show_terms=show_terms,
+    )
 
 
 def generate_standard_input_template(
@@ -1507,30 +1987,27 @@ def generate_standard_input_template(
     include_hotel_reco: when True, add hotel_reco_grid_4 rows (headline, recommender type)
     Returns (csv_content, links_dict).
     """
-    import json
     locales = include_locales or ["en"]
     mods = list(modules)
     if include_hotel_reco and "hotel_reco_grid_4" not in mods:
         mods.append("hotel_reco_grid_4")
-    rows: list[tuple[str, str, int, list[str]]] = []  # (Key, Module, module_index, [en, ...])
     module_indices: dict[str, int] = {}
     for mod in mods:
-        if mod not in MODULE_TEMPLATE_ROWS:
-            continue
-        idx = module_indices.get(mod, len(module_indices) + 1)
-        module_indices[mod] = idx
-        for csv_key, placeholder in MODULE_TEMPLATE_ROWS[mod]:
-            vals = [placeholder if i == 0 else "" for i in range(len(locales))]
-            rows.append((csv_key, mod, idx, vals))
-    headers = ["Key", "Module", "module_index"] + locales
-    out = [headers]
-    for key, mod, idx, vals in rows:
-        out.append([key, mod, str(idx)] + vals)
-    writer = csv.StringIO()
-    csv_writer = csv.writer(writer)
-    csv_writer.writerows(out)
+        if mod in MODULE_TEMPLATE_ROWS:
+            module_indices.setdefault(mod, len(module_indices) + 1)
+    # Placeholder goes in the first locale column; the rest are left for translators
+    blank_locales = [""] * (len(locales) - 1)
+    buf = StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["Key", "Module", "module_index"] + locales)
+    writer.writerows(
+        [csv_key, mod, str(module_indices[mod]), placeholder, *blank_locales]
+        for mod in mods
+        if mod in MODULE_TEMPLATE_ROWS
+        for csv_key, placeholder in MODULE_TEMPLATE_ROWS[mod]
+    )
     links = load_standard_links()
-    return writer.getvalue(), links
+    return buf.getvalue(), links
 
 
 BASE_TEMPLATE = r'''{%- comment -%}
@@ -1538,97 +2015,25 @@ FULL EMAIL HTML (multi-locale from translations CSV)
 - Requires CSV with Key + locale columns. Run: python3 csv_translations_to_email.py email_translations.csv
 {%- endcomment -%}
 
-{%- assign lang = customer.language | default: "en" | downcase | replace: "_", "-" -%}
-{%- assign lang2 = lang | slice: 0, 2 -%}
-{%- assign locale_key = lang2 -%}
-{%- assign country = customer.country_code | default: customer.country | default: "" | upcase | slice: 0, 2 -%}
-{%- if lang2 == "iw" -%}{%- assign locale_key = "he" -%}{%- endif -%}
-{%- if lang contains "zh-hk" or lang contains "zh-hant-hk" -%}{%- assign locale_key = "zh-hk" -%}
-{%- elsif lang contains "zh-tw" or lang contains "zh-hant" -%}{%- assign locale_key = "zh-tw" -%}
-{%- elsif lang contains "zh-cn" or lang contains "zh-sg" or lang contains "zh-hans" -%}{%- assign locale_key = "zh-cn" -%}
-{%- elsif lang contains "fr-ca" -%}{%- assign locale_key = "fr-ca" -%}
-{%- elsif lang contains "pt-br" -%}{%- assign locale_key = "pt-br" -%}
-{%- elsif lang contains "pt-pt" -%}{%- assign locale_key = "pt" -%}
-{%- elsif lang contains "en-gb" -%}{%- assign locale_key = "en-gb" -%}
-{%- elsif lang2 == "es" and lang contains "-" and lang != "es-es" -%}{%- assign locale_key = "es-419" -%}
-{%- elsif lang2 == "tl" or lang contains "fil" -%}{%- assign locale_key = "fil" -%}
-{%- elsif lang2 == "nb" or lang2 == "nn" -%}{%- assign locale_key = "no" -%}
-{%- endif -%}
-{%- assign is_portuguese = false -%}
-{%- if lang2 == "pt" or lang contains "portuguese" -%}{%- assign is_portuguese = true -%}{%- endif -%}
-{%- if is_portuguese -%}
-  {%- if country == "BR" -%}{%- assign locale_key = "pt-br" -%}
-  {%- elsif country == "PT" -%}{%- assign locale_key = "pt" -%}
-  {%- elsif lang contains "pt-pt" -%}{%- assign locale_key = "pt" -%}
-  {%- elsif lang contains "pt-br" -%}{%- assign locale_key = "pt-br" -%}
-  {%- else -%}{%- assign locale_key = "pt-br" -%}
-  {%- endif -%}
-{%- elsif lang2 == "es" and locale_key == "es" -%}
-  {%- assign latam_countries = "MX,AR,CO,CL,PE,VE,EC,GT,HN,SV,NI,PA,PR,DO,CR,BO,PY,UY,CU" | split: "," -%}
-  {%- assign is_latam = false -%}
-  {%- for cc in latam_countries -%}{%- if country == cc -%}{%- assign is_latam = true -%}{%- break -%}{%- endif -%}{%- endfor -%}
-  {%- if is_latam -%}{%- assign locale_key = "es-419" -%}{%- endif -%}
-{%- elsif lang2 == "en" and locale_key == "en" and country == "GB" -%}{%- assign locale_key = "en-gb" -%}
-{%- elsif lang2 == "fr" and locale_key == "fr" and country == "CA" -%}{%- assign locale_key = "fr-ca" -%}
-{%- endif -%}
-
+''' + LOCALE_KEY_BLOCK + r'''
 {%- assign rtl_locales = "ar,he,fa,ur" | split: "," -%}
 {%- assign dir = "ltr" -%}
-{%- if rtl_locales contains locale_key -%}{%- assign dir = "rtl" -%}{%- endif -%}
 {%- assign headline_align = "center" -%}
-{%- if locale_key == "ar" or locale_key == "he" -%}{%- assign headline_align = "right" -%}{%- endif -%}
 {%- assign align = "left" -%}
-{%- if locale_key == "ar" or locale_key == "he" -%}{%- assign align = "right" -%}{%- endif -%}
+{%- if rtl_locales contains locale_key -%}
+  {%- assign dir = "rtl" -%}
+  {%- if locale_key == "ar" or locale_key == "he" -%}{%- assign headline_align = "right" -%}{%- assign align = "right" -%}{%- endif -%}
+{%- endif -%}
 ''' + PLACEHOLDER_LINKS + '''
 {%- assign app_deeplink_url = app_deeplink_url | default: link_app_download_page -%}
 ''' + PLACEHOLDER_DESIGN_TOKENS + '''
 
-''' + PLACEHOLDER_CONFIG + '''
+''' + PLACEHOLDER_CONFIG + PLACEHOLDER_HOTEL_RECO_ASSIGNS + '''
 ''' + PLACEHOLDER_APP_DOWNLOAD_SETTINGS + '''
 
 ''' + PLACEHOLDER_CONTENT_CAPTURES + '''
 
-{%- capture footer_app_line -%}
-  {%- case locale_key -%}
-    {%- when "ar" -%}احجز كأهل البلد. حمّل التطبيق.
-    {%- when "zh-cn" -%}订房有一套。 下载应用。
-    {%- when "zh-tw" -%}懂玩的人，都這樣訂房 下載應用程式
-    {%- when "zh-hk" -%}訂得安心。 下載應用程式。
-    {%- when "hr" -%}Rezervirajte pametnije. Preuzmite aplikaciju.
-    {%- when "cs" -%}Rezervujte levou zadní. Stáhněte si aplikaci.
-    {%- when "da" -%}Book med overblik. Download appen.
-    {%- when "nl" -%}Boeken zonder poespas. Download de app.
-    {%- when "en-gb" -%}Book like an insider. Download the app.
-    {%- when "en" -%}Book like an insider. Download the app.
-    {%- when "fil" -%}Mag-book nang may kumpyansa. I-download ang app.
-    {%- when "fi" -%}Varaa fiksusti. Lataa sovellus.
-    {%- when "fr" -%}Réserver sans se tromper. Télécharger l'application.
-    {%- when "fr-ca" -%}Réservez en toute confiance. Télécharger l'application.
-    {%- when "de" -%}Buchen mit klarem Blick. App herunterladen.
-    {%- when "el" -%}Κάνε τώρα τις πιο έξυπνες κρατήσεις. Κατεβάστε την εφαρμογή.
-    {%- when "he" -%}להזמין חכם זה פשוט. הורידו את האפליקציה.
-    {%- when "hu" -%}Foglaljon magabiztosan. Töltse le az alkalmazást.
-    {%- when "id" -%}Pesan tanpa cemas. Unduh aplikasi.
-    {%- when "it" -%}Prenotare senza pensieri. Scarica l'app.
-    {%- when "ja" -%}納得して予約する。アプリをダウンロード。
-    {%- when "ko" -%}예약에 확신을 더하다. 앱을 다운로드하세요.
-    {%- when "ms" -%}Kejelasan diutamakan. Tempah tanpa ragu. Muat turun aplikasi.
-    {%- when "no" -%}Book som en insider. Last ned appen.
-    {%- when "pl" -%}Rezerwuj jak zawodowiec. Pobierz aplikację.
-    {%- when "pt" -%}Reserve com confiança. Descarregue a app.
-    {%- when "pt-br" -%}Reserve sem erro. Baixe o app.
-    {%- when "ro" -%}Rezervă cu toată încrederea. Descarcă aplicația.
-    {%- when "ru" -%}Бронируйте с умом. Скачайте приложение.
-    {%- when "es" -%}Reservar sin equivocarse. Descarga la app.
-    {%- when "es-419" -%}Reservar sin equivocarse. Descarga la aplicación.
-    {%- when "sv" -%}Boka som en insider. Ladda ner appen.
-    {%- when "th" -%}จองคุ้มว่า ราคาแบบคนวงใน ดาวน์โหลดแอป
-    {%- when "tr" -%}Daha akıllıca rezervasyon yap. Uygulamayı indirin.
-    {%- when "uk" -%}Бронюй як місцевий. Завантажте застосунок.
-    {%- when "vi" -%}Đặt chỗ thông minh hơn. Tải ứng dụng.
-    {%- else -%}Book like an insider. Download the app.
-  {%- endcase -%}
-{%- endcapture -%}
+''' + PLACEHOLDER_FOOTER_APP_LINE + '''
 {%- capture google_play_badge_url -%}
   {%- case locale_key -%}
     {%- when "ar" -%}https://userimg-assets.customeriomail.com/images/client-env-124967/1771236962918_GetItOnGooglePlay_Badge_Web_color_Arabic-Saudi-Arabia_01KHJZ6CN2JBA5CF1HGYEBR0ZB.png
@@ -1712,52 +2117,7 @@ FULL EMAIL HTML (multi-locale from translations CSV)
 {%- endcapture -%}
 {%- assign app_store_badge_url = app_store_badge_url | strip | default: "https://userimg-assets.customeriomail.com/images/client-env-124967/1771861742970_en_01KJ5K15DG7W6K6VRFV8G3ZN6D.png" -%}
 {%- capture footer_address -%}FindHotel B.V. Nieuwe Looiersdwarsstraat 17, 1017 TZ, Amsterdam, The Netherlands.{%- endcapture -%}
-{%- capture footer_prefs_text -%}
-  {%- case locale_key -%}
-    {%- when "ar" -%}قم بتحديث <emailPreferences>تفضيلات بريدك الإلكتروني</emailPreferences> لاختيار رسائل البريد الإلكتروني التي تتلقاها أو <unsubscribe>إلغاء الاشتراك</unsubscribe> من كل رسائل البريد الإلكتروني.
-    {%- when "zh-cn" -%}更新 <emailPreferences>电子邮件偏好设置</emailPreferences>，选择接收哪些邮件或 <unsubscribe>退订</unsubscribe>所有邮件。
-    {%- when "zh-tw" -%}更新 <emailPreferences>電子郵件偏好</emailPreferences>，選擇要收到哪些電子郵件，或是 <unsubscribe>取消訂閱</unsubscribe>所有電子郵件。
-    {%- when "zh-hk" -%}更新 <emailPreferences>電郵偏好設定</emailPreferences>以選擇接收哪些電郵或 <unsubscribe>取消訂閱</unsubscribe>所有電郵。
-    {%- when "hr" -%}Ažurirajte svoje <emailPreferences>postavke za e-mail</emailPreferences> kako biste odabrali koje e-poruke želite primati ili se u potpunosti <unsubscribe>odjavite</unsubscribe>.
-    {%- when "cs" -%}Upravte si <emailPreferences>předvolby e-mailů</emailPreferences> a vyberte sdělení, která chcete dostávat. Můžete si také <unsubscribe>odhlásit odběr</unsubscribe> veškerých e-mailů.
-    {%- when "da" -%}Opdater <emailPreferences>indstillinger for e-mail</emailPreferences> for at vælge, hvilke e-mails du får, eller <unsubscribe>afmeld</unsubscribe> alle e-mails.
-    {%- when "nl" -%}Werk je <emailPreferences>e-mailvoorkeuren</emailPreferences> bij om te kiezen welke e-mails je wilt ontvangen of om je <unsubscribe>af te melden</unsubscribe> voor alle e-mails.
-    {%- when "en-gb" -%}Update your <emailPreferences>email preferences</emailPreferences> to choose which emails you get or <unsubscribe>unsubscribe</unsubscribe> from all emails.
-    {%- when "en" -%}Update your <emailPreferences>email preferences</emailPreferences> to choose which emails you get or <unsubscribe>unsubscribe</unsubscribe> from all emails.
-    {%- when "fil" -%}I-update ang <emailPreferences>mga preference mo sa email</emailPreferences> para piliin kung anong mga email ang matatanggap mo o <unsubscribe>mag-unsubscribe</unsubscribe> sa lahat ng email.
-    {%- when "fi" -%}Päivitä <emailPreferences>sähköpostiasetukset</emailPreferences> ja valitse saamasi sähköpostiviestit tai <unsubscribe>peruuta</unsubscribe> kaikkien sähköpostiviestien tilaus.
-    {%- when "fr" -%}Mettez à jour vos <emailPreferences>préférences en matière d'e-mails</emailPreferences> pour choisir ce que vous souhaitez recevoir ou pour vous <unsubscribe>désabonner</unsubscribe> de tous les e-mails.
-    {%- when "fr-ca" -%}Mettez à jour vos <emailPreferences>préférences de courriel</emailPreferences> pour choisir les courriels que vous recevez ou vous <unsubscribe>désabonner</unsubscribe> de tous les courriels.
-    {%- when "de" -%}Aktualisieren Sie Ihre <emailPreferences>E-Mail-Einstellungen</emailPreferences>, um auszuwählen, welche E-Mails Sie erhalten möchten, oder um sich von allen E-Mails <unsubscribe>abzumelden</unsubscribe>.
-    {%- when "el" -%}Ενημερώστε τις <emailPreferences>προτιμήσεις email</emailPreferences> σας για να επιλέξετε ποια email θα λαμβάνετε ή να <unsubscribe>καταργήσετε την εγγραφή σας</unsubscribe> από όλα τα email.
-    {%- when "he" -%}יש לעדכן את <emailPreferences>העדפות האימייל</emailPreferences> שלכם כדי לבחור אילו אימיילים לקבל, או <unsubscribe>לבטל את המינוי</unsubscribe> על כל האימיילים.
-    {%- when "hu" -%}Frissítse <emailPreferences>e-mail-beállításait</emailPreferences>, hogy kiválaszthassa, mely e-maileket szeretné megkapni, vagy <unsubscribe>leiratkozhat</unsubscribe> az összes e-mailről.
-    {%- when "id" -%}Perbarui <emailPreferences>preferensi email</emailPreferences> Anda untuk memilih email mana yang Anda dapatkan atau <unsubscribe>berhenti berlangganan</unsubscribe> dari semua email.
-    {%- when "it" -%}Aggiorna le <emailPreferences>preferenze delle email</emailPreferences> per scegliere quali email ricevere o per <unsubscribe>cancellare l'iscrizione</unsubscribe> a tutte le email.
-    {%- when "ja" -%}<emailPreferences>メール設定</emailPreferences>を更新して、受信するメールを選択したり、すべてのメールの<unsubscribe>登録を解除</unsubscribe>したりできます。
-    {%- when "ko" -%}<emailPreferences>이메일 환경 설정</emailPreferences>을 업데이트하여 받을 이메일을 선택하거나 모든 이메일을 <unsubscribe>구독 해제</unsubscribe>할 수 있어요.
-    {%- when "ms" -%}Kemas kini <emailPreferences>keutamaan e-mel</emailPreferences> anda untuk memilih e-mel yang anda terima atau <unsubscribe>nyahlanggan</unsubscribe> semua e-mel.
-    {%- when "no" -%}Oppdater <emailPreferences>e-postpreferansene</emailPreferences> dine for å velge hvilke e-poster du får, eller <unsubscribe>avslutt abonnementet</unsubscribe> på alle e-poster.
-    {%- when "pl" -%}Aktualizacja <emailPreferences>preferencji dotyczących e-maili</emailPreferences> pozwala wybrać, które wiadomości chcesz otrzymywać, lub <unsubscribe>zrezygnować</unsubscribe> ze wszystkich wiadomości.
-    {%- when "pt" -%}Atualize as suas <emailPreferences>preferências de e-mail</emailPreferences> para escolher os e-mails que recebe ou <unsubscribe>cancele a subscrição</unsubscribe> de todos os e-mails.
-    {%- when "pt-br" -%}Atualize suas <emailPreferences>preferências de e-mail</emailPreferences> para escolher quais e-mails você deseja receber ou <unsubscribe>cancele a inscrição</unsubscribe> de todos os e-mails.
-    {%- when "ro" -%}Actualizează-ți <emailPreferences>preferințele de e-mail</emailPreferences> pentru a alege ce e-mailuri primești sau pentru a te <unsubscribe>dezabona</unsubscribe> de la toate e-mailurile.
-    {%- when "ru" -%}Обновите <emailPreferences>настройки электронной почты</emailPreferences>, чтобы выбрать, какие письма получать, или <unsubscribe>отмените подписку</unsubscribe> на все рассылки.
-    {%- when "es" -%}Actualiza tus <emailPreferences>preferencias de correo electrónico</emailPreferences> para elegir qué correos electrónicos deseas recibir o para <unsubscribe>cancelar la suscripción</unsubscribe> a todos los correos electrónicos.
-    {%- when "es-419" -%}Actualiza tus <emailPreferences>preferencias de correo electrónico</emailPreferences> para elegir qué mensajes quieres recibir o <unsubscribe>cancelar tu suscripción</unsubscribe> de todos los correos.
-    {%- when "sv" -%}Uppdatera dina <emailPreferences>e-postinställningar</emailPreferences> för att välja vilka e-postmeddelanden du får eller <unsubscribe>avsluta</unsubscribe> alla prenumerationer.
-    {%- when "th" -%}อัปเดต <emailPreferences>การตั้งค่าอีเมล</emailPreferences>เพื่อเลือกอีเมลที่คุณต้องการรับหรือ <unsubscribe>ยกเลิกการสมัคร</unsubscribe>รับอีเมลทั้งหมด
-    {%- when "tr" -%}<emailPreferences>E-posta tercihlerinizi</emailPreferences> güncelleyerek hangi e-postaları alacağınızı belirleyebilir ya da tüm e-posta <unsubscribe>aboneliklerinden çıkabilirsiniz</unsubscribe>.
-    {%- when "uk" -%}Оновіть <emailPreferences>налаштування електронних листів</emailPreferences>, щоб вибрати, які електронні листи отримувати, або <unsubscribe>відмовитися від підписки</unsubscribe> на всі електронні листи.
-    {%- when "vi" -%}Cập nhật <emailPreferences>tùy chọn email</emailPreferences> của bạn để chọn email bạn nhận được hoặc <unsubscribe>hủy đăng ký</unsubscribe> khỏi tất cả email.
-    {%- else -%}Update your <emailPreferences>email preferences</emailPreferences> to choose which emails you get or <unsubscribe>unsubscribe</unsubscribe> from all emails.
-  {%- endcase -%}
-{%- endcapture -%}
-{%- capture email_prefs_open -%}<a href="{{snippets.vio_notification_preferences}}" style="color:inherit;text-decoration:underline !important" target="_blank">{%- endcapture -%}
-{%- capture email_prefs_close -%}</a>{%- endcapture -%}
-{%- capture unsub_open -%}<a href="{{snippets.vio_notification_preferences_unsubscribe}}" class="untracked" style="color:inherit;text-decoration:underline !important" target="_blank">{%- endcapture -%}
-{%- capture unsub_close -%}</a>{%- endcapture -%}
-{%- assign footer_prefs_html = footer_prefs_text | replace: "<emailPreferences>", email_prefs_open | replace: "</emailPreferences>", email_prefs_close | replace: "<unsubscribe>", unsub_open | replace: "</unsubscribe>", unsub_close -%}
+''' + PLACEHOLDER_FOOTER_PREFS + '''
 ''' + PLACEHOLDER_TERMS_DEFAULTS + '''
 {%- capture terms_link -%}<a href="{{ link_terms_of_use }}" target="_blank" style="color:{{ token_text_muted }};text-decoration:underline !important">{{ terms_label | strip }}</a>{%- endcapture -%}
 {%- capture privacy_link -%}<a href="{{ link_privacy_policy }}" target="_blank" style="color:{{ token_text_muted }};text-decoration:underline !important">{{ privacy_label | strip }}</a>{%- endcapture -%}
@@ -1857,7 +2217,6 @@ FULL EMAIL HTML (multi-locale from translations CSV)
                       <td class="email-footer-pad" style="padding:0;text-align:center;">
                         <img alt="Vio.com" src="https://userimg-assets.customeriomail.com/images/client-env-124967/1770377276677_Vector_HighDef_01KGSBAVCB07TGMTGYZBMPCWD9.png" style="display:block;outline:none;border:none;text-decoration:none;margin:0 auto;" width="90" />
                         <p style="font-size:20px;line-height:28px;font-weight:600;font-family:{{ token_font_stack }};text-align:center;margin:0;color:{{ token_accent }};padding-top:{{ token_space_300 }};padding-bottom:0;direction:{{ dir }};unicode-bidi:plaintext;">
-                          {%- assign footer_app_line_html = footer_app_line | replace: ". ", "<br />" | replace: ".", "" -%}
                           {{ footer_app_line_html | strip }}
                         </p>
                         <div style="height:14px;line-height:14px;font-size:1px;">&nbsp;</div>
@@ -1910,8 +2269,104 @@ FULL EMAIL HTML (multi-locale from translations CSV)
 '''
 
 
+_BASE_SEGMENTS, _BASE_SLOTS = _compile_template(BASE_TEMPLATE, _TEMPLATE_PLACEHOLDERS)
+# Every placeholder must appear exactly once, so a typo fails at import instead of leaving a marker in the output
+assert sorted(_BASE_SLOTS) == sorted(_TEMPLATE_PLACEHOLDERS), "BASE_TEMPLATE placeholders out of sync"
+
+# Flag-gated sections of BASE_TEMPLATE; dropped from the output when the flag is off
+_GATED_BLOCK_RES = {
+    flag: re.compile(r'\{%%- if %s == "TRUE" -%%\}.*?\{%%- endif -%%\}' % flag, re.DOTALL)
+    for flag in ("show_footer", "show_terms")
+}
+
+
+def _gate_is_flat(flag: str) -> bool:
+    """The gate appears once, inside one segment, with no nested if: the lazy match ends at the first
+    endif, so anything else would leave an orphan endif in the flag-off output."""
+    blocks = [m.group(0) for seg in _BASE_SEGMENTS for m in _GATED_BLOCK_RES[flag].finditer(seg)]
+    return (
+        BASE_TEMPLATE.count(f'if {flag} == "TRUE"') == 1
+        and len(blocks) == 1
+        and len(re.findall(r"\{%-?\s*if\s", blocks[0])) == 1
+    )
+
+
+assert all(_gate_is_flat(flag) for flag in _GATED_BLOCK_RES), "flag-gated BASE_TEMPLATE block is not flat"
+
+
+def _mtime_ns(path: Path) -> int:
+    """File modification time for cache keys; 0 when the file does not exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+@functools.lru_cache(maxsize=32)
+def _assemble_static_shell(
+    design_tokens_brand: str,
+    links_items: tuple[tuple[str, str], ...] | None,
+    show_header_logo: str,
+    show_footer: str,
+    show_terms: str,
+    app_download_colour_preset: str,
+    _source_mtimes: tuple[int, ...],
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """BASE_TEMPLATE segments with the CSV-independent blocks (links, design tokens, config, app settings,
+    terms defaults) filled in. Cached per option set; _source_mtimes invalidates on file edits."""
+    static = {
+        PLACEHOLDER_LINKS: build_links_block(dict(links_items) if links_items else None),
+        PLACEHOLDER_DESIGN_TOKENS: _load_design_tokens(brand=design_tokens_brand),
+        PLACEHOLDER_APP_DOWNLOAD_SETTINGS: build_app_download_settings({}),
+        PLACEHOLDER_TERMS_DEFAULTS: build_terms_defaults_block(),
+        PLACEHOLDER_CONFIG: build_config_block(show_header_logo, show_footer, show_terms, app_download_colour_preset),
+    }
+    segments = _BASE_SEGMENTS
+    for flag, val in (("show_footer", show_footer), ("show_terms", show_terms)):
+        if _norm_bool_flag(val) == "FALSE":
+            segments = tuple(_GATED_BLOCK_RES[flag].sub("", seg, count=1) for seg in segments)
+    # Per-call slots are left open for generate_template
+    return _fill_template(segments, _BASE_SLOTS, static)
+
+
+@functools.lru_cache(maxsize=16)
+def _build_csv_blocks(
+    csv_path: str,
+    locales: tuple[str, ...],
+    _csv_stamp: tuple[int, int],
+) -> tuple[dict[str, str], dict[str, str]]:
+    """Parse the CSV and run the content builders; returns (placeholder -> block, structure).
+    Cached so re-rendering one CSV with different options skips parsing and building;
+    _csv_stamp (mtime_ns, size) invalidates on file changes. Results are shared, do not mutate."""
+    translations, structure = _load_translations_cached(csv_path, _csv_stamp, locales)
+    return _build_content_blocks(translations, structure, list(locales)), structure
+
+
+def _build_content_blocks(
+    translations: dict[str, dict[str, str]],
+    structure: dict[str, str],
+    locales: list[str],
+) -> dict[str, str]:
+    """Run the CSV-dependent builders; returns placeholder -> block."""
+    if not translations and not structure:
+        sys.exit("No rows found in CSV. Expected column 'Key' and locale columns: en, ar, zh-cn, ...")
+    return {
+        PLACEHOLDER_CONTENT_CAPTURES: build_content_captures(translations, include_locales=locales),
+        PLACEHOLDER_FOOTER_APP_LINE: build_footer_capture("footer_app_line_html", _FOOTER_APP_LINES_HTML, locales),
+        PLACEHOLDER_FOOTER_PREFS: build_footer_capture("footer_prefs_html", _FOOTER_PREFS_HTML, locales),
+        PLACEHOLDER_ROWS_ABOVE_IMAGE: build_rows_above_image(translations),
+        PLACEHOLDER_IMAGE_ROW: build_image_row(structure),
+        PLACEHOLDER_ROWS_BELOW_IMAGE: build_rows_below_image(translations, structure),
+        PLACEHOLDER_HERO_TWO_COLUMN_MODULE: build_hero_two_column_module(translations, structure),
+        PLACEHOLDER_ICON_LEFT_TEXT_RIGHT_MODULE: build_usp_module(translations, structure),
+        PLACEHOLDER_TEXT_LEFT_IMAGE_RIGHT_MODULE: build_usp_feature_module(translations, structure),
+        PLACEHOLDER_ALTERNATING_TEXT_IMAGE_MODULE: build_usp_ui_module(translations, structure),
+        PLACEHOLDER_APP_DOWNLOAD_MODULE: build_app_download_module(translations, structure),
+    }
+
+
 def generate_template(
-    csv_path: Path | str,
+    csv_path: Path | str | None,
     *,
     show_header_logo: str = "TRUE",
     show_footer: str = "TRUE",
@@ -1921,59 +2376,160 @@ def generate_template(
     links_config: dict[str, str] | None = None,
     include_locales: list[str] | None = None,
     include_hotel_reco: bool = False,
+    translations: dict[str, dict[str, str]] | None = None,
+    structure: dict[str, str] | None = None,
 ) -> str:
     """Generate the Liquid email template from a translations CSV. Returns the template string.
-    include_locales: locales to include in output (when clauses). If None, inferred from CSV headers."""
-    csv_path = Path(csv_path)
-    if not csv_path.exists():
-        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+    include_locales: locales to include in output (when clauses). If None, inferred from CSV headers.
+    translations/structure: already-parsed load_translations() output, so batch callers rendering
+    several variants of one CSV parse it once. With include_locales as well, csv_path may be None."""
+    return "".join(
+        _generate_template_parts(
+            csv_path,
+            show_header_logo=show_header_logo,
+            show_footer=show_footer,
+            show_terms=show_terms,
+            app_download_colour_preset=app_download_colour_preset,
+            design_tokens_brand=design_tokens_brand,
+            links_config=links_config,
+            include_locales=include_locales,
+            include_hotel_reco=include_hotel_reco,
+            translations=translations,
+            structure=structure,
+        )
+    )
+
+
+def generate_template_bytes(csv_path: Path | str | None, **options) -> bytes:
+    """generate_template() as UTF-8 bytes (same keyword arguments), for writing to a file or socket.
+    The CSV-independent parts of the template are encoded once per option set, not per call."""
+    return b"".join(_generate_template_parts(csv_path, encoded=True, **options))
+
+
+@functools.lru_cache(maxsize=32)
+def _encode_segments(segments: tuple[str, ...]) -> tuple[bytes, ...]:
+    """UTF-8 copy of a cached static shell's segments."""
+    return tuple(seg.encode("utf-8") for seg in segments)
+
+
+def _generate_template_parts(
+    csv_path: Path | str | None,
+    *,
+    show_header_logo: str = "TRUE",
+    show_footer: str = "TRUE",
+    show_terms: str = "TRUE",
+    app_download_colour_preset: str = "LIGHT",
+    design_tokens_brand: str = "vio",
+    links_config: dict[str, str] | None = None,
+    include_locales: list[str] | None = None,
+    include_hotel_reco: bool = False,
+    translations: dict[str, dict[str, str]] | None = None,
+    structure: dict[str, str] | None = None,
+    encoded: bool = False,
+) -> list[str] | list[bytes]:
+    """generate_template() as a list of parts, so the CLI can write them without joining.
+    encoded: return UTF-8 bytes parts instead of str."""
+    if translations is None or not include_locales:
+        csv_path = Path(csv_path)
+        if not csv_path.exists():
+            raise FileNotFoundError(f"CSV file not found: {csv_path}")
     locales = include_locales or get_csv_locales(csv_path)
-    translations, structure = load_translations(csv_path, include_locales=locales)
-    if not translations and not structure:
-        sys.exit("No rows found in CSV. Expected column 'Key' and locale columns: en, ar, zh-cn, ...")
-    content_captures = build_content_captures(translations, include_locales=locales)
-    rows_above = build_rows_above_image(translations)
-    image_row = build_image_row(structure)
-    rows_below = build_rows_below_image(translations, structure)
-    hero_two_col = build_hero_two_column_module(translations, structure)
-    icon_left_text_right_module = build_usp_module(translations, structure)
-    text_left_image_right_module = build_usp_feature_module(translations, structure)
-    alternating_text_image_module = build_usp_ui_module(translations, structure)
-    app_download = build_app_download_module(translations, structure)
+    if translations is not None:
+        structure = structure if structure is not None else {}
+        csv_blocks = _build_content_blocks(translations, structure, locales)
+    else:
+        st = csv_path.stat()
+        csv_blocks, structure = _build_csv_blocks(str(csv_path), tuple(locales), (st.st_mtime_ns, st.st_size))
     hotel_reco = ""
+    hotel_reco_assigns = ""
     if include_hotel_reco:
         mod_content = _load_hotel_reco_module()
         if mod_content:
             hotel_reco = f'<tr><td style="padding:0;vertical-align:top;">{mod_content}</td></tr>'
-    config = build_config_block(
+        hotel_reco_assigns = "\n" + _build_hotel_reco_assigns_block(structure)
+    base = Path(__file__).parent
+    shell_segments, shell_slots = _assemble_static_shell(
+        design_tokens_brand,
+        tuple(links_config.items()) if links_config else None,
         show_header_logo,
         show_footer,
         show_terms,
         app_download_colour_preset,
+        (
+            _mtime_ns(_get_design_tokens_path(design_tokens_brand)),
+            _mtime_ns(base / "standard_links.json"),
+            _mtime_ns(base / "full_email_template.liquid"),
+        ),
     )
-    if include_hotel_reco:
-        config += "\n" + _build_hotel_reco_assigns_block(structure)
-    design_tokens = _load_design_tokens(brand=design_tokens_brand)
-    app_settings = build_app_download_settings(structure)
-    links_block = build_links_block(links_config)
-    result = (
-        BASE_TEMPLATE.replace(PLACEHOLDER_LINKS, links_block)
-        .replace(PLACEHOLDER_DESIGN_TOKENS, design_tokens)
-        .replace(PLACEHOLDER_APP_DOWNLOAD_SETTINGS, app_settings)
-        .replace(PLACEHOLDER_CONTENT_CAPTURES, content_captures)
-        .replace(PLACEHOLDER_ROWS_ABOVE_IMAGE, rows_above)
-        .replace(PLACEHOLDER_IMAGE_ROW, image_row)
-        .replace(PLACEHOLDER_ROWS_BELOW_IMAGE, rows_below)
-        .replace(PLACEHOLDER_HERO_TWO_COLUMN_MODULE, hero_two_col)
-        .replace(PLACEHOLDER_ICON_LEFT_TEXT_RIGHT_MODULE, icon_left_text_right_module)
-        .replace(PLACEHOLDER_TEXT_LEFT_IMAGE_RIGHT_MODULE, text_left_image_right_module)
-        .replace(PLACEHOLDER_ALTERNATING_TEXT_IMAGE_MODULE, alternating_text_image_module)
-        .replace(PLACEHOLDER_HOTEL_RECO_GRID_4, hotel_reco)
-        .replace(PLACEHOLDER_APP_DOWNLOAD_MODULE, app_download)
-        .replace(PLACEHOLDER_TERMS_DEFAULTS, build_terms_defaults_block())
-        .replace(PLACEHOLDER_CONFIG, config)
-    )
-    return result
+    subs = {
+        **csv_blocks,
+        PLACEHOLDER_HOTEL_RECO_GRID_4: hotel_reco,
+        PLACEHOLDER_HOTEL_RECO_ASSIGNS: hotel_reco_assigns,
+    }
+    if _minify_enabled():
+        text = _minify_template("".join(_template_parts(shell_segments, shell_slots, subs)))
+        return [text.encode("utf-8")] if encoded else [text]
+    if encoded:
+        return _template_parts(
+            _encode_segments(shell_segments), shell_slots, {k: v.encode("utf-8") for k, v in subs.items()}
+        )
+    return _template_parts(shell_segments, shell_slots, subs)
+
+
+# Opt-in output minification. Whitespace next to {%- / -%} is trimmed by Liquid anyway, and a run of
+# whitespace between two tags renders the same as a single newline.
+_MINIFY_LIQUID_TRIM_RE = re.compile(r"\s+(?=\{%-)|(?<=-%\})\s+")
+_MINIFY_BETWEEN_TAGS_RE = re.compile(r">\s{2,}<")
+
+
+def _minify_enabled() -> bool:
+    return os.environ.get("EMAILFORGE_MINIFY", "").strip().lower() not in ("", "0", "false")
+
+
+def _minify_template(text: str) -> str:
+    return _MINIFY_BETWEEN_TAGS_RE.sub(">\n<", _MINIFY_LIQUID_TRIM_RE.sub("", text))
+
+
+def _template_cache_dir() -> Path | None:
+    """CLI output cache directory; one file per distinct (inputs, options) render. Resolved on use,
+    not at import: without a home directory there is simply no cache."""
+    try:
+        return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "emailforge"
+    except (RuntimeError, OSError):
+        return None
+
+
+def _template_cache_path(csv_path: Path, options: dict) -> Path | None:
+    """Cache entry for a CLI render. Keyed on the contents of every file the output depends on
+    (CSV, design tokens, links, terms source and this generator itself) plus the options."""
+    cache_dir = _template_cache_dir()
+    if cache_dir is None:
+        return None
+    base = Path(__file__).parent
+    key = repr((sorted(options.items()), _minify_enabled()))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16)
+    for path in (
+        csv_path,
+        Path(__file__),
+        _get_design_tokens_path(options["design_tokens_brand"]),
+        base / "standard_links.json",
+        base / "full_email_template.liquid",
+    ):
+        digest.update(b"\0")
+        if path.is_file():
+            digest.update(path.read_bytes())
+    return cache_dir / f"{digest.hexdigest()}.liquid"
+
+
+def _write_template_cache(cache_path: Path, parts: list[bytes]) -> None:
+    """Write atomically so a concurrent run never reads a partial file; the cache is best-effort."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=cache_path.parent, suffix=".tmp", delete=False) as f:
+            f.writelines(parts)
+        os.replace(f.name, cache_path)
+    except OSError:
+        pass
 
 
 def main():
@@ -2008,6 +2564,12 @@ def main():
         default=None,
         help="Comma-separated locale codes, e.g. en,es,fr. Overrides --locale-preset.",
     )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="Always regenerate instead of reusing a cached template from an identical earlier run.",
+    )
     parser.add_argument(
         "--subject-preheader",
         dest="subject_preheader",
@@ -2023,16 +2585,34 @@ def main():
         include_locales = [x.strip() for x in args.include_locales.split(",") if x.strip()]
     elif args.locale_preset:
         include_locales = resolve_include_locales(args.locale_preset)
-    result = generate_template(
-        csv_path,
-        show_header_logo=args.show_header_logo,
-        show_footer=args.show_footer,
-        show_terms=args.show_terms,
-        app_download_colour_preset=args.app_download_colour_preset,
-        design_tokens_brand=args.design_tokens_brand,
-        include_locales=include_locales,
-    )
-    sys.stdout.write(result)
+    options = {
+        "show_header_logo": args.show_header_logo,
+        "show_footer": args.show_footer,
+        "show_terms": args.show_terms,
+        "app_download_colour_preset": args.app_download_colour_preset,
+        "design_tokens_brand": args.design_tokens_brand,
+        "include_locales": include_locales,
+    }
+    cache_path = None if args.no_cache else _template_cache_path(csv_path, options)
+    # Template bytes go straight to the binary stream as UTF-8 (text stdout only when there is none,
+    # e.g. under a capturing test runner); cache hits are copied through without decoding
+    out = getattr(sys.stdout, "buffer", None)
+    if out is not None:
+        sys.stdout.flush()
+    parts = None
+    if cache_path is not None and cache_path.is_file():
+        try:
+            parts = [cache_path.read_bytes()]
+        except OSError:
+            pass
+    if parts is None:
+        parts = _generate_template_parts(csv_path, encoded=True, **options)
+        if cache_path is not None:
+            _write_template_cache(cache_path, parts)
+    if out is not None:
+        out.writelines(parts)
+    else:
+        sys.stdout.write(b"".join(parts).decode("utf-8"))
     if args.subject_preheader:
         translations, _ = load_translations(csv_path, include_locales=include_locales)
         snippets = build_customerio_subject_preheader_snippets(
@@ -2051,24 +2631,145 @@ def main():
             sys.stderr.write(f"Wrote {out_path}\n")
 
 
+def _token_assigns(text: str) -> dict[str, str]:
+    """token_name -> quoted value from {%- assign token_xyz = "value" -%} lines (one assign per line,
+    as in the token files); unquoted values are skipped. Plain str.partition, no regex."""
+    tokens = {}
+    for line in text.splitlines():
+        _, sep, rest = line.partition("assign")
+        if not sep or not rest[:1].isspace():
+            continue
+        name, sep, rest = rest.partition("=")
+        name = name.strip()
+        if not sep or not name.startswith("token_") or not name.isidentifier():
+            continue
+        rest = rest.lstrip()
+        if rest[:1] != '"':
+            continue
+        val, sep, _ = rest[1:].partition('"')
+        if sep:
+            tokens[name] = val
+    return tokens
+
+
 def _parse_design_tokens(brand: str = "vio") -> dict[str, str]:
-    """Parse design tokens for the given brand and return token_name -> value map."""
-    import re
+    """Parse design tokens for the given brand and return token_name -> value map.
+    Cached per (file, mtime); the returned dict is shared, so callers must not mutate it."""
     tokens_path = _get_design_tokens_path(brand)
+    return _parse_design_tokens_file(str(tokens_path), _mtime_ns(tokens_path))
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_design_tokens_file(tokens_path_str: str, _mtime_ns: int) -> dict[str, str]:
+    tokens_path = Path(tokens_path_str)
     if not tokens_path.exists():
         return {}
     text = tokens_path.read_text(encoding="utf-8")
-    # Match {%- assign token_xyz = "value" -%} or = number -%}
-    pattern = r"assign\s+(token_\w+)\s*=\s*\"([^\"]*)\""
-    tokens = dict(re.findall(pattern, text))
-    # Resolve token refs (e.g. token_bg_page = token_neutral_c050)
-    for _ in range(3):
-        for k, v in list(tokens.items()):
-            if v.startswith("token_") and v in tokens:
-                tokens[k] = tokens[v]
+    tokens = _token_assigns(text)
+    # Resolve token refs (e.g. token_bg_page = token_neutral_c050) by walking each alias chain once;
+    # every token on the chain gets the final value, so shared chains are not walked again.
+    done: set[str] = set()
+    for key, val in tokens.items():
+        if key in done or val not in tokens:
+            continue
+        chain = [key]
+        while val in tokens and val not in chain:  # stops at cycles
+            if val in done:
+                val = tokens[val]
+                break
+            chain.append(val)
+            val = tokens[val]
+        for k in chain:
+            tokens[k] = val
+        done.update(chain)
     return tokens
 
 
+# Liquid stripping for the preview, compiled once
+_RE_COMMENT = re.compile(r"{%-?\s*comment\s+-?%}.*?{%-?\s*endcomment\s+-?%}", re.DOTALL)
+_RE_ASSIGN = re.compile(r"{%-?\s*assign\s+[^%]+-?%}")
+_RE_CAPTURE = re.compile(r"{%-?\s*capture\s+\w+\s+-?%}.*?{%-?\s*endcapture\s+-?%}", re.DOTALL)
+_RE_CASE = re.compile(r"{%-?\s*case\s+[^%]+-?%}.*?{%-?\s*endcase\s+-?%}", re.DOTALL)
+_RE_CTRL = re.compile(r"{%-?\s*(?:if|elsif|else|endif|when|for|endfor|break)\s+[^%]*-?%}")
+_RE_MUSTACHE = re.compile(r"{{[^}]*}}")
+# All of the above except _RE_MUSTACHE in one pass; block constructs come first so they swallow their bodies
+_RE_LIQUID_TAGS = re.compile(
+    "|".join(rx.pattern for rx in (_RE_COMMENT, _RE_CAPTURE, _RE_CASE, _RE_ASSIGN, _RE_CTRL)), re.DOTALL
+)
+
+
+# Flag/module conditionals resolved by the preview, matched together in one pass
+_PREVIEW_CONDITIONALS = (
+    "_show_header_logo",
+    "show_header_logo",
+    "show_footer",
+    "show_terms",
+    "app_download_title != blank",
+    "hero_two_col_body_1_h2 != blank",
+    "usp_title != blank",
+    "usp_feature_title != blank",
+    "usp_ui_title != blank",
+)
+_RE_CONDITIONAL = re.compile(
+    r"{%-?\s*if\s+(" + "|".join(re.escape(c) for c in _PREVIEW_CONDITIONALS) + r")[^%]+-?%}(.*?){%-?\s*endif\s+-?%}",
+    re.DOTALL,
+)
+
+
+# Translatable keys substituted in the preview, with their pre-formatted mustache forms
+_CONTENT_VARS = (
+    "subject_line", "preheader", "headline", "headline_2", "secondary_headline",
+    "body_1", "body_2", "cta_text", "app_download_title",
+    "app_download_feature_1", "app_download_feature_2", "app_download_feature_3",
+    "hero_two_col_body_1_h2", "hero_two_col_body_1_copy", "hero_two_col_body_2_h2",
+    "hero_two_col_body_2_copy", "hero_two_col_body_3_h2", "hero_two_col_body_3_copy",
+    "hero_two_col_body_4_h2", "hero_two_col_body_4_copy", "hero_two_col_cta_text",
+    "terms_title", "terms_desc_text", "terms_label", "privacy_label",
+    "usp_title", "usp_1_heading", "usp_1_copy", "usp_2_heading", "usp_2_copy",
+    "usp_3_heading", "usp_3_copy",
+    "usp_feature_title", "usp_feature_1_heading", "usp_feature_1_copy",
+    "usp_feature_2_heading", "usp_feature_2_copy", "usp_feature_3_heading", "usp_feature_3_copy",
+    "usp_ui_title", "usp_ui_1_heading", "usp_ui_1_copy",
+    "usp_ui_2_heading", "usp_ui_2_copy", "usp_ui_3_heading", "usp_ui_3_copy",
+)
+_PREVIEW_EN_KEYS = tuple(dict.fromkeys((*_CONTENT_VARS, "terms_title", "terms_desc_text", "terms_label", "privacy_label")))
+_TERMS_DESC_LINK_RE = re.compile(r"\{terms\}|\{privacyPolicy\}")
+_CONTENT_STRIP_KEYS = tuple(f"{{{{ {k} | strip }}}}" for k in _CONTENT_VARS)
+_CONTENT_PLAIN_KEYS = tuple(f"{{{{ {k} }}}}" for k in _CONTENT_VARS)
+
+
+# Preview values for the {{ link_* }} variables; Liquid snippet links have no static URL
+_LINK_REPLACEMENTS = {
+    f"{{{{ link_{key.translate(_LINK_VAR_NAME_CHARS)} }}}}": (url if "snippets" not in url else "#")
+    for key, url in DEFAULT_LINKS.items()
+}
+
+# Preview replacements that do not depend on the CSV, flags or brand
+_STATIC_PREVIEW_REPLACEMENTS = {
+    "{{ dir }}": "ltr",
+    "{{ align }}": "left",
+    "{{ headline_align }}": "center",
+    "{{ locale_key }}": "en",
+    "{{ google_play_badge_url }}": "https://userimg-assets.customeriomail.com/images/client-env-124967/1771236964477_GetItOnGooglePlay_Badge_Web_color_English_01KHJZ6E5TKNXTSE65NBZACEG9.png",
+    "{{ app_store_badge_url }}": "https://userimg-assets.customeriomail.com/images/client-env-124967/1771861742970_en_01KJ5K15DG7W6K6VRFV8G3ZN6D.png",
+    "{{ footer_app_line_html | strip }}": _FOOTER_APP_LINES_HTML["en"],
+    "{{ footer_address | strip }}": "FindHotel B.V. Nieuwe Looiersdwarsstraat 17, 1017 TZ, Amsterdam, The Netherlands.",
+    "{{ footer_prefs_html }}": "Update your email preferences or unsubscribe.",
+    **_LINK_REPLACEMENTS,
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _strip_preview_liquid(html: str, keep: tuple[bool, ...]) -> str:
+    """Resolve the _PREVIEW_CONDITIONALS (keep: one flag each, same order), then remove the remaining
+    Liquid tags: comments, assigns, captures, case/when, for."""
+    if "{%" not in html:
+        return html
+    keep_by_cond = dict(zip(_PREVIEW_CONDITIONALS, keep))
+    html = _RE_CONDITIONAL.sub(lambda m: m.group(2) if keep_by_cond[m.group(1)] else "", html)
+    return _RE_LIQUID_TAGS.sub("", html)
+
+
 def liquid_to_preview_html(
     liquid_content: str,
     translations: dict[str, dict[str, str]],
@@ -2083,7 +2784,6 @@ def liquid_to_preview_html(
     Convert Liquid template to static HTML for preview (English locale).
     Does regex substitution of tokens and content; strips Liquid control flow.
     """
-    import re
     html = liquid_content
     # Replace hotel_reco_grid_4 Liquid block with static preview (module uses API data at send time)
     if "<!-- MODULE: hotel_reco_grid_4 START -->" in html:
@@ -2099,92 +2799,58 @@ def liquid_to_preview_html(
                     row_end += len("</td></tr>")
                     html = html[:row_start] + _build_hotel_reco_preview_html(structure) + html[row_end:]
     tokens = _parse_design_tokens(brand=design_tokens_brand)
-    en = "en"
-    # Content replacements from translations (en locale)
-    content_vars = [
-        "subject_line", "preheader", "headline", "headline_2", "secondary_headline",
-        "body_1", "body_2", "cta_text", "app_download_title",
-        "app_download_feature_1", "app_download_feature_2", "app_download_feature_3",
-        "hero_two_col_body_1_h2", "hero_two_col_body_1_copy", "hero_two_col_body_2_h2",
-        "hero_two_col_body_2_copy", "hero_two_col_body_3_h2", "hero_two_col_body_3_copy",
-        "hero_two_col_body_4_h2", "hero_two_col_body_4_copy", "hero_two_col_cta_text",
-        "terms_title", "terms_desc_text", "terms_label", "privacy_label",
-        "usp_title", "usp_1_heading", "usp_1_copy", "usp_2_heading", "usp_2_copy",
-        "usp_3_heading", "usp_3_copy",
-        "usp_feature_title",         "usp_feature_1_heading", "usp_feature_1_copy",
-        "usp_feature_2_heading", "usp_feature_2_copy", "usp_feature_3_heading", "usp_feature_3_copy",
-        "usp_ui_title", "usp_ui_1_heading", "usp_ui_1_copy",
-        "usp_ui_2_heading", "usp_ui_2_copy", "usp_ui_3_heading", "usp_ui_3_copy",
-    ]
-    replacements: dict[str, str] = {}
-    for k in content_vars:
-        v = (translations.get(k) or {}).get(en, "")
-        replacements[f"{{{{ {k} | strip }}}}"] = v
-        replacements[f"{{{{ {k} }}}}"] = v
+    # Content replacements from translations (en locale), projected to the keys the preview reads
+    en_view = {k: vals["en"] for k in _PREVIEW_EN_KEYS if (vals := translations.get(k)) and "en" in vals}
+    replacements: dict[str, str] = dict(_STATIC_PREVIEW_REPLACEMENTS)
+    content_vals = [en_view.get(k, "") for k in _CONTENT_VARS]
+    replacements.update(zip(_CONTENT_STRIP_KEYS, content_vals))
+    replacements.update(zip(_CONTENT_PLAIN_KEYS, content_vals))
     # Token replacements
     for name, val in tokens.items():
         replacements[f"{{{{ {name} }}}}"] = val
     # Simple vars
-    replacements["{{ dir }}"] = "ltr"
-    replacements["{{ align }}"] = "left"
-    replacements["{{ headline_align }}"] = "center"
-    replacements["{{ locale_key }}"] = "en"
     replacements["{{ app_deeplink_url }}"] = structure.get("image_deeplink") or DEFAULT_LINKS["app_download_page"]
     replacements["{{ app_download_colour }}"] = tokens.get("token_neutral_c050", "#fcf7f5")
-    replacements["{{ google_play_badge_url }}"] = "https://userimg-assets.customeriomail.com/images/client-env-124967/1771236964477_GetItOnGooglePlay_Badge_Web_color_English_01KHJZ6E5TKNXTSE65NBZACEG9.png"
-    replacements["{{ app_store_badge_url }}"] = "https://userimg-assets.customeriomail.com/images/client-env-124967/1771861742970_en_01KJ5K15DG7W6K6VRFV8G3ZN6D.png"
-    # Link variables (from standard_links)
-    for key, url in DEFAULT_LINKS.items():
-        var = "link_" + key.replace(".", "_").replace("-", "_")
-        replacements[f"{{{{ {var} }}}}"] = url if "snippets" not in url else "#"
     replacements["{{ app_download_text_colour }}"] = tokens.get("token_text_primary", "#180c06")
     # Footer/terms placeholders
-    replacements["{{ footer_app_line }}"] = "Book like an insider. Download the app."
-    replacements["{{ footer_address | strip }}"] = "FindHotel B.V. Nieuwe Looiersdwarsstraat 17, 1017 TZ, Amsterdam, The Netherlands."
-    replacements["{{ terms_title | strip }}"] = (translations.get("terms_title") or {}).get(en, "Terms and Privacy Policy")
-    replacements["{{ footer_prefs_html }}"] = "Update your email preferences or unsubscribe."
-    terms_desc = (translations.get("terms_desc_text") or {}).get(en, "This booking is covered by our {terms} and {privacyPolicy}.")
-    terms_lbl = (translations.get("terms_label") or {}).get(en, "Terms")
-    privacy_lbl = (translations.get("privacy_label") or {}).get(en, "Privacy Policy")
+    replacements["{{ terms_title | strip }}"] = en_view.get("terms_title", "Terms and Privacy Policy")
+    terms_desc = en_view.get("terms_desc_text", "This booking is covered by our {terms} and {privacyPolicy}.")
+    terms_lbl = en_view.get("terms_label", "Terms")
+    privacy_lbl = en_view.get("privacy_label", "Privacy Policy")
     link_terms = DEFAULT_LINKS.get("terms_of_use", "#")
     link_privacy = DEFAULT_LINKS.get("privacy_policy", "#")
     muted = tokens.get("token_text_muted", "#615a56")
     terms_a = f'<a href="{link_terms}" target="_blank" style="color:{muted};text-decoration:underline !important">{terms_lbl}</a>'
     privacy_a = f'<a href="{link_privacy}" target="_blank" style="color:{muted};text-decoration:underline !important">{privacy_lbl}</a>'
-    replacements["{{ terms_desc_html }}"] = terms_desc.replace("{terms}", terms_a).replace("{privacyPolicy}", privacy_a)
-
-    # html already set above (may have been modified for hotel reco)
-    for k, v in replacements.items():
-        html = html.replace(k, v)
-
-    # Strip {%- if show_header_logo -%}...{%- endif -%} based on flags
-    def _replace_conditional(prefix: str, keep: bool):
-        nonlocal html
-        pattern = rf'({{%-?\s*if\s+{prefix}[^%]+-?%}})(.*?)({{%-?\s*endif\s+-?%}})'
-        if keep:
-            html = re.sub(pattern, r"\2", html, flags=re.DOTALL)
-        else:
-            html = re.sub(pattern, "", html, flags=re.DOTALL)
-
-    _replace_conditional("_show_header_logo", show_header_logo)
-    _replace_conditional("show_header_logo", show_header_logo)
-    _replace_conditional("show_footer", show_footer)
-    _replace_conditional("show_terms", show_terms)
-    _replace_conditional("app_download_title != blank", "app_download_title" in translations)
-    _replace_conditional("hero_two_col_body_1_h2 != blank", "hero_two_col_body_1_h2" in translations)
-    _replace_conditional("usp_title != blank", "usp_title" in translations)
-    _replace_conditional("usp_feature_title != blank", "usp_feature_title" in translations)
-    _replace_conditional("usp_ui_title != blank", "usp_ui_title" in translations)
-
-    # Remove remaining Liquid: comments, assigns, captures, case/when, for
-    html = re.sub(r"{%-?\s*comment\s+-?%}.*?{%-?\s*endcomment\s+-?%}", "", html, flags=re.DOTALL)
-    html = re.sub(r"{%-?\s*assign\s+[^%]+-?%}", "", html)
-    html = re.sub(r"{%-?\s*capture\s+\w+\s+-?%}.*?{%-?\s*endcapture\s+-?%}", "", html, flags=re.DOTALL)
-    html = re.sub(r"{%-?\s*case\s+[^%]+-?%}.*?{%-?\s*endcase\s+-?%}", "", html, flags=re.DOTALL)
-    html = re.sub(r"{%-?\s*(?:if|elsif|else|endif|when|for|endfor|break)\s+[^%]*-?%}", "", html)
-    # Replace any remaining {{ var }} with empty string to avoid broken output
-    html = re.sub(r"{{[^}]*}}", "", html)
-    return html
+    terms_links = {"{terms}": terms_a, "{privacyPolicy}": privacy_a}
+    replacements["{{ terms_desc_html }}"] = (
+        _TERMS_DESC_LINK_RE.sub(lambda m: terms_links[m.group()], terms_desc) if "{" in terms_desc else terms_desc
+    )
+
+    # Flag/module conditionals and the remaining Liquid tags do not depend on the content values,
+    # so they are resolved first (cached, for re-previews of the same template) and variables last
+    keep = (
+        show_header_logo,
+        show_header_logo,
+        show_footer,
+        show_terms,
+        "app_download_title" in translations,
+        "hero_two_col_body_1_h2" in translations,
+        "usp_title" in translations,
+        "usp_feature_title" in translations,
+        "usp_ui_title" in translations,
+    )
+    html = _strip_preview_liquid(html, keep)
+
+    # Every {{ ... }} is matched by one generic pattern and looked up verbatim (the keys are exact
+    # tag texts), so no per-key alternation is needed. Unknown {{ var }} are dropped to avoid broken
+    # output. Inserted values are not rescanned and the skeleton was stripped before substitution, so
+    # any Liquid they carry (tags as well as output tags) is stripped here.
+    def _sub_var(m: re.Match[str]) -> str:
+        v = replacements.get(m.group(0), "")
+        return _RE_MUSTACHE.sub("", _RE_LIQUID_TAGS.sub("", v)) if "{" in v else v
+
+    return _RE_MUSTACHE.sub(_sub_var, html)
 
 
 if __name__ == "__main__":